@@ -2,7 +2,7 @@
 import base64
 from datetime import datetime, timedelta
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import matplotlib.pyplot as plt
 
@@ -72,6 +72,20 @@ def generate_charts(chart_type: str = "frequency") -> Dict[str, str]:
     Returns:
         Dict compatible with ChartData model with base64 encoded chart image
     """
+    png_bytes, chart_type = generate_charts_bytes(chart_type)
+    image_base64 = base64.b64encode(png_bytes).decode("utf-8")
+    return {"chart_type": chart_type, "image_base64": image_base64, "format": "png"}
+
+
+def generate_charts_bytes(chart_type: str = "frequency") -> Tuple[bytes, str]:
+    """
+    Render a workout progress chart as raw PNG bytes.
+
+    Used directly by in-process callers (the Streamlit UI) to skip the base64 round-trip.
+
+    Returns:
+        Tuple of (png_bytes, chart_type actually rendered)
+    """
     workouts = get_workout_history(limit=100)  # Get more for trends
 
     if not workouts:
@@ -102,7 +116,7 @@ def generate_charts(chart_type: str = "frequency") -> Dict[str, str]:
             ax.set_title("Workout Frequency (Workouts per Week)")
             ax.set_xticks(range(len(weeks)))
             ax.set_xticklabels([f"Week {i+1}" for i in range(len(weeks))], rotation=45)
-            plt.tight_layout()
+            fig.tight_layout()
 
         elif chart_type == "equipment":
             # Equipment usage chart
@@ -120,7 +134,7 @@ def generate_charts(chart_type: str = "frequency") -> Dict[str, str]:
                 ax.set_xlabel("Usage Count")
                 ax.set_ylabel("Equipment")
                 ax.set_title("Equipment Usage Frequency")
-                plt.tight_layout()
+                fig.tight_layout()
             else:
                 fig, ax = plt.subplots(figsize=(10, 6))
                 ax.text(
@@ -129,13 +143,10 @@ def generate_charts(chart_type: str = "frequency") -> Dict[str, str]:
                 ax.axis("off")
         else:
             # Default: frequency chart
-            return generate_charts("frequency")
+            return generate_charts_bytes("frequency")
 
-    # Convert to base64
     buf = BytesIO()
-    plt.savefig(buf, format="png", dpi=100, bbox_inches="tight")
-    buf.seek(0)
-    image_base64 = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches="tight")
+    plt.close(fig)
 
-    return {"chart_type": chart_type, "image_base64": image_base64, "format": "png"}
+    return buf.getvalue(), chart_type
@@ -1,9 +1,12 @@
 """Location Activity Agent for ROAMFIT - MCP Server."""
 from typing import Any, Dict, List, Optional
 
-from geopy.distance import geodesic
+import numpy as np
 from geopy.geocoders import Nominatim
 
+from models.schemas import Location
+from utils.geo import haversine_km, nearest_within_radius
+
 
 def geocode_location(location: str) -> Optional[Dict[str, float]]:
     """Geocode a location string to coordinates."""
@@ -23,6 +26,17 @@ def geocode_location(location: str) -> Optional[Dict[str, float]]:
         return None
 
 
+def _to_location(place: Any, distance_km: float) -> Dict[str, Any]:
+    """Convert a geopy result and its distance into a Location dict."""
+    return Location(
+        name=place.address.split(",")[0] if place.address else "Unknown",
+        address=place.address or "Address not available",
+        latitude=place.latitude,
+        longitude=place.longitude,
+        distance_km=distance_km,
+    ).to_dict()
+
+
 def find_nearby_places(
     location: str, place_type: str, radius_km: float = 2.0, limit: int = 10
 ) -> List[Dict[str, Any]]:
@@ -45,7 +59,6 @@ def find_nearby_places(
 
     base_lat = coords["latitude"]
     base_lon = coords["longitude"]
-    base_point = (base_lat, base_lon)
 
     # Search for places
     geolocator = Nominatim(user_agent="roamfit_app")
@@ -58,28 +71,19 @@ def find_nearby_places(
         if not results:
             return []
 
-        # Calculate distances and filter by radius
-        places = []
-        for place in results:
-            if place.latitude and place.longitude:
-                place_point = (place.latitude, place.longitude)
-                distance_km = geodesic(base_point, place_point).kilometers
-
-                if distance_km <= radius_km:
-                    places.append(
-                        {
-                            "name": place.address.split(",")[0] if place.address else "Unknown",
-                            "address": place.address or "Address not available",
-                            "latitude": place.latitude,
-                            "longitude": place.longitude,
-                            "distance_km": round(distance_km, 2),
-                            "distance_m": round(distance_km * 1000, 0),
-                        }
-                    )
-
-        # Sort by distance and limit results
-        places.sort(key=lambda x: x["distance_km"])
-        return places[:limit]
+        # Calculate all distances in one vectorized pass
+        candidates = [place for place in results if place.latitude and place.longitude]
+        if not candidates:
+            return []
+        distances = haversine_km(
+            base_lat,
+            base_lon,
+            np.array([place.latitude for place in candidates], dtype=np.float64),
+            np.array([place.longitude for place in candidates], dtype=np.float64),
+        )
+
+        nearest = nearest_within_radius(distances, radius_km, limit)
+        return [_to_location(candidates[i], float(distances[i])) for i in nearest.tolist()]
 
     except Exception as e:
         print(f"Search error: {e}")
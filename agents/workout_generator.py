@@ -17,7 +17,10 @@ def generate_workout(
 ) -> Dict[str, Any]:
     """Generate workout plan based on equipment and history."""
     logger.info(
-        f"Generating workout: equipment={equipment}, location={location}, has_history={workout_history is not None}"
+        "Generating workout: equipment=%s, location=%s, has_history=%s",
+        equipment,
+        location,
+        workout_history is not None,
     )
 
     if not equipment:
@@ -124,10 +127,10 @@ JSON response:"""
                     completed=False,
                 )
                 workout_plan["workout_id"] = workout_id
-                logger.info(f"Workout generated and saved with ID: {workout_id}")
+                logger.info("Workout generated and saved with ID: %s", workout_id)
             except Exception as e:
                 # Don't fail if saving fails, just log it
-                logger.error(f"Failed to save workout to database: {str(e)}", exc_info=True)
+                logger.error("Failed to save workout to database: %s", e, exc_info=True)
                 workout_plan["save_error"] = str(e)
 
         logger.info("Workout generation completed successfully")
@@ -44,7 +44,7 @@ Workout History:
 
 Provide a concise summary:"""
 
-    summary = call_llm(prompt, agent_name="workout_summary")
+    summary = call_llm(prompt, agent_name="workout_summary", cache=True)
 
     history = WorkoutHistory(
         summary=summary,
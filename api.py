@@ -7,18 +7,25 @@ from typing import Optional
 
 from fastapi import FastAPI, File, Form, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
 from agents.strands_orchestrator import create_roamfit_orchestrator
 from config import setup_logging
 from utils.exceptions import ValidationError, handle_exception
-from utils.validation import validate_equipment_list, validate_image_file, validate_location
+from utils.responses import OrjsonResponse
+from utils.validation import (
+    detect_image_mime,
+    validate_equipment_list,
+    validate_image_file,
+    validate_location,
+)
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ROAMFIT API (Strands)", version="2.0.0")
+app = FastAPI(
+    title="ROAMFIT API (Strands)", version="2.0.0", default_response_class=OrjsonResponse
+)
 
 # Add CORS middleware for Streamlit
 app.add_middleware(
@@ -36,14 +43,21 @@ async def log_requests(request: Request, call_next):
     """Log all API requests."""
     start_time = time.time()
     logger.info(
-        f"Request: {request.method} {request.url.path} from {request.client.host if request.client else 'unknown'}"
+        "Request: %s %s from %s",
+        request.method,
+        request.url.path,
+        request.client.host if request.client else "unknown",
     )
 
     response = await call_next(request)
 
     process_time = time.time() - start_time
     logger.info(
-        f"Response: {request.method} {request.url.path} - {response.status_code} ({process_time:.3f}s)"
+        "Response: %s %s - %s (%.3fs)",
+        request.method,
+        request.url.path,
+        response.status_code,
+        process_time,
     )
 
     return response
@@ -75,7 +89,7 @@ async def chat_endpoint(
     - image: Equipment photo file (jpg, jpeg, png)
     """
     logger.info(
-        f"API request: POST /chat from {request.client.host if request.client else 'unknown'}"
+        "API request: POST /chat from %s", request.client.host if request.client else "unknown"
     )
 
     try:
@@ -83,14 +97,15 @@ async def chat_endpoint(
         if not message or not message.strip():
             raise ValidationError("message parameter is required and cannot be empty")
 
-        # Validate image if provided
+        # Validate image if provided; the upload is read once and reused below
+        content = b""
         if image:
             content = await image.read()
             is_valid, error_msg = validate_image_file(content, filename=image.filename)
             if not is_valid:
                 raise ValidationError(error_msg or "Invalid image file")
 
-            logger.info(f"Image uploaded: {image.filename}, size: {len(content)} bytes")
+            logger.info("Image uploaded: %s, size: %d bytes", image.filename, len(content))
 
         orchestrator = get_orchestrator()
 
@@ -99,25 +114,24 @@ async def chat_endpoint(
 
         # Handle image if provided
         if image:
-            content = await image.read()
             image_base64 = base64.b64encode(content).decode("utf-8")
-            image_data_uri = f"data:image/jpeg;base64,{image_base64}"
+            image_data_uri = f"data:{detect_image_mime(content)};base64,{image_base64}"
             query = f"I've uploaded an image of my available equipment. Please detect the equipment from this image: {image_data_uri}. {query}"
 
         # Get response from orchestrator
-        logger.info(f"Calling orchestrator with query length: {len(query)}")
+        logger.info("Calling orchestrator with query length: %d", len(query))
         response = orchestrator(query)
 
         logger.info("Chat endpoint completed successfully")
-        return JSONResponse(
+        return OrjsonResponse(
             content={"response": str(response), "message": message, "has_image": image is not None}
         )
 
     except ValidationError as e:
-        logger.warning(f"Validation error in /chat: {e.message}")
+        logger.warning("Validation error in /chat: %s", e.message)
         return handle_exception(e, context="chat_endpoint")
     except Exception as e:
-        logger.error(f"Unexpected error in /chat: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in /chat: %s", e, exc_info=True)
         return handle_exception(e, context="chat_endpoint")
 
 
@@ -139,7 +153,8 @@ async def generate_workout_endpoint(
     - location: Location string (e.g., "Hotel Gym, Room 205")
     """
     logger.info(
-        f"API request: POST /generate-workout from {request.client.host if request.client else 'unknown'}"
+        "API request: POST /generate-workout from %s",
+        request.client.host if request.client else "unknown",
     )
 
     try:
@@ -149,13 +164,14 @@ async def generate_workout_endpoint(
 
         equipment_list = None
 
-        # Validate image if provided
+        # Validate image if provided; the upload is read once and reused below
+        content = b""
         if image:
             content = await image.read()
             is_valid, error_msg = validate_image_file(content, filename=image.filename)
             if not is_valid:
                 raise ValidationError(error_msg or "Invalid image file")
-            logger.info(f"Image uploaded: {image.filename}, size: {len(content)} bytes")
+            logger.info("Image uploaded: %s, size: %d bytes", image.filename, len(content))
 
         # Validate equipment if provided
         if equipment:
@@ -166,7 +182,7 @@ async def generate_workout_endpoint(
                 )
                 if not is_valid:
                     raise ValidationError(error_msg or "Invalid equipment list")
-                logger.info(f"Equipment provided: {equipment_list}")
+                logger.info("Equipment provided: %s", equipment_list)
             except json.JSONDecodeError:
                 # Try as single string
                 is_valid, error_msg, equipment_list = validate_equipment_list([equipment])
@@ -178,7 +194,7 @@ async def generate_workout_endpoint(
             is_valid, error_msg = validate_location(location)
             if not is_valid:
                 raise ValidationError(error_msg or "Invalid location format")
-            logger.info(f"Location provided: {location}")
+            logger.info("Location provided: %s", location)
 
         orchestrator = get_orchestrator()
 
@@ -186,9 +202,8 @@ async def generate_workout_endpoint(
         query_parts = []
 
         if image:
-            content = await image.read()
             image_base64 = base64.b64encode(content).decode("utf-8")
-            image_data_uri = f"data:image/jpeg;base64,{image_base64}"
+            image_data_uri = f"data:{detect_image_mime(content)};base64,{image_base64}"
             query_parts.append(
                 f"I've uploaded an image of my available equipment: {image_data_uri}"
             )
@@ -211,7 +226,7 @@ async def generate_workout_endpoint(
         response = orchestrator(query)
 
         logger.info("Workout generation completed successfully")
-        return JSONResponse(
+        return OrjsonResponse(
             content={
                 "workout_plan": str(response),
                 "equipment": equipment_list if equipment_list else "detected from image",
@@ -221,10 +236,10 @@ async def generate_workout_endpoint(
         )
 
     except ValidationError as e:
-        logger.warning(f"Validation error in /generate-workout: {e.message}")
+        logger.warning("Validation error in /generate-workout: %s", e.message)
         return handle_exception(e, context="generate_workout_endpoint")
     except Exception as e:
-        logger.error(f"Unexpected error in /generate-workout: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in /generate-workout: %s", e, exc_info=True)
         return handle_exception(e, context="generate_workout_endpoint")
 
 
@@ -250,5 +265,5 @@ async def health():
         logger.debug("Health check passed")
         return {"status": "healthy", "orchestrator": "initialized"}
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}", exc_info=True)
+        logger.error("Health check failed: %s", e, exc_info=True)
         return {"status": "unhealthy", "error": str(e)}
@@ -17,6 +17,8 @@ def get_config() -> Dict[str, str]:
     """Load configuration from environment variables with defaults."""
     return {
         "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", ""),
+        # Optional JSON list of {"api_key", "base_url"} endpoints to spread LLM calls across
+        "OPENAI_POOL": os.getenv("OPENAI_POOL", ""),
         "DATABASE_PATH": os.getenv("DATABASE_PATH", "db/roamfit.db"),
         "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
         "LLM_MODEL": os.getenv("LLM_MODEL", "gpt-4"),
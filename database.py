@@ -1,39 +1,56 @@
 """Database operations for ROAMFIT."""
-import json
 import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
 
 from config import get_config
 from utils.exceptions import DatabaseError
+from utils.pricing import estimate_cost
 
 logger = logging.getLogger(__name__)
 
 
+_local = threading.local()
+
+
+def _thread_connection(path: str) -> sqlite3.Connection:
+    """Return this thread's cached connection to path, opening it on first use."""
+    conns: Dict[str, sqlite3.Connection] = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(path)
+    if conn is None:
+        # uri=True also accepts "file:...?mode=memory" URIs; plain paths work unchanged
+        conn = sqlite3.connect(path, uri=True)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers and the writer proceed concurrently; NORMAL skips most fsyncs
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conns[path] = conn
+    return conn
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections."""
+    """Context manager yielding this thread's database connection inside a transaction."""
     config = get_config()
-    conn = sqlite3.connect(config["DATABASE_PATH"])
-    conn.row_factory = sqlite3.Row
+    conn = _thread_connection(config["DATABASE_PATH"])
     try:
         yield conn
         conn.commit()
     except Exception:
         conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 def create_tables():
     """Create all database tables if they don't exist."""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-
-        cursor.execute(
+        # Single executescript call instead of one round-trip per table
+        conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS workouts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,34 +59,22 @@ def create_tables():
                 workout_plan TEXT NOT NULL,
                 location TEXT,
                 completed INTEGER DEFAULT 0
-            )
-        """
-        )
+            );
 
-        cursor.execute(
-            """
             CREATE TABLE IF NOT EXISTS equipment_detections (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
                 image_path TEXT NOT NULL,
                 detected_equipment TEXT NOT NULL,
                 location TEXT
-            )
-        """
-        )
+            );
 
-        cursor.execute(
-            """
             CREATE TABLE IF NOT EXISTS user_preferences (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 key TEXT UNIQUE NOT NULL,
                 value TEXT NOT NULL
-            )
-        """
-        )
+            );
 
-        cursor.execute(
-            """
             CREATE TABLE IF NOT EXISTS llm_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 agent_name TEXT NOT NULL,
@@ -80,11 +85,25 @@ def create_tables():
                 time_ms INTEGER DEFAULT 0,
                 error_message TEXT,
                 created_at TEXT NOT NULL
-            )
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_workouts_date ON workouts(date DESC, id DESC);
         """
         )
 
 
+def _row_to_workout(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a workouts row into a workout dict, decoding its JSON columns."""
+    return {
+        "id": row["id"],
+        "date": row["date"],
+        "equipment": orjson.loads(row["equipment"]),
+        "workout_plan": orjson.loads(row["workout_plan"]),
+        "location": row["location"],
+        "completed": bool(row["completed"]),
+    }
+
+
 def save_workout(
     equipment: List[str],
     workout_plan: Dict,
@@ -94,11 +113,14 @@ def save_workout(
     """Save a workout to database. Returns workout ID."""
     try:
         logger.info(
-            f"Saving workout: equipment={equipment}, location={location}, completed={completed}"
+            "Saving workout: equipment=%s, location=%s, completed=%s",
+            equipment,
+            location,
+            completed,
         )
         date = datetime.now().isoformat()
-        equipment_json = json.dumps(equipment)
-        workout_plan_json = json.dumps(workout_plan)
+        equipment_json = orjson.dumps(equipment).decode()
+        workout_plan_json = orjson.dumps(workout_plan).decode()
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -110,10 +132,10 @@ def save_workout(
                 (date, equipment_json, workout_plan_json, location, 1 if completed else 0),
             )
             workout_id = int(cursor.lastrowid) if cursor.lastrowid else 0
-            logger.info(f"Workout saved successfully with ID: {workout_id}")
+            logger.info("Workout saved successfully with ID: %s", workout_id)
             return workout_id
     except Exception as e:
-        logger.error(f"Failed to save workout: {str(e)}", exc_info=True)
+        logger.error("Failed to save workout: %s", e, exc_info=True)
         raise DatabaseError(
             message=f"Failed to save workout: {str(e)}",
             operation="save_workout",
@@ -121,6 +143,40 @@ def save_workout(
         )
 
 
+def save_workouts_bulk(workouts: List[Dict[str, Any]]) -> int:
+    """Save many workouts (save_workout kwargs) in one transaction. Returns the count saved."""
+    try:
+        date = datetime.now().isoformat()
+        rows = [
+            (
+                date,
+                orjson.dumps(w["equipment"]).decode(),
+                orjson.dumps(w["workout_plan"]).decode(),
+                w.get("location"),
+                1 if w.get("completed") else 0,
+            )
+            for w in workouts
+        ]
+
+        with get_db_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO workouts (date, equipment, workout_plan, location, completed)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
+        logger.info("Saved %d workouts in bulk", len(rows))
+        return len(rows)
+    except Exception as e:
+        logger.error("Failed to save workouts in bulk: %s", e, exc_info=True)
+        raise DatabaseError(
+            message=f"Failed to save workouts in bulk: {str(e)}",
+            operation="save_workouts_bulk",
+            details={"count": len(workouts)},
+        )
+
+
 def get_last_workout() -> Optional[Dict]:
     """Get the most recent workout. Returns None if no workouts exist."""
     with get_db_connection() as conn:
@@ -128,7 +184,7 @@ def get_last_workout() -> Optional[Dict]:
         cursor.execute(
             """
             SELECT * FROM workouts
-            ORDER BY date DESC
+            ORDER BY date DESC, id DESC
             LIMIT 1
         """
         )
@@ -137,44 +193,32 @@ def get_last_workout() -> Optional[Dict]:
         if row is None:
             return None
 
-        return {
-            "id": row["id"],
-            "date": row["date"],
-            "equipment": json.loads(row["equipment"]),
-            "workout_plan": json.loads(row["workout_plan"]),
-            "location": row["location"],
-            "completed": bool(row["completed"]),
-        }
+        return _row_to_workout(row)
 
 
-def get_workout_history(limit: int = 5) -> List[Dict]:
-    """Get recent workout history. Returns list of workouts."""
+def get_workout_history(limit: int = 5, offset: int = 0) -> List[Dict]:
+    """Get recent workout history, newest first, skipping `offset` rows. Returns list of workouts."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        # id breaks ties between equal dates so pages never overlap
         cursor.execute(
             """
             SELECT * FROM workouts
-            ORDER BY date DESC
-            LIMIT ?
+            ORDER BY date DESC, id DESC
+            LIMIT ? OFFSET ?
         """,
-            (limit,),
+            (limit, offset),
         )
-        rows = cursor.fetchall()
+        return [_row_to_workout(row) for row in cursor.fetchall()]
 
-        workouts = []
-        for row in rows:
-            workouts.append(
-                {
-                    "id": row["id"],
-                    "date": row["date"],
-                    "equipment": json.loads(row["equipment"]),
-                    "workout_plan": json.loads(row["workout_plan"]),
-                    "location": row["location"],
-                    "completed": bool(row["completed"]),
-                }
-            )
 
-        return workouts
+def get_workout_signature() -> Tuple[int, Optional[str]]:
+    """Return (total_workouts, last_workout_date) - a cheap key for caching workout views."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) as count, MAX(date) as last_date FROM workouts")
+        row = cursor.fetchone()
+        return row["count"], row["last_date"]
 
 
 def update_workout_completion(workout_id: int, completed: bool = True) -> bool:
@@ -208,14 +252,7 @@ def get_workout_by_id(workout_id: int) -> Optional[Dict]:
         if row is None:
             return None
 
-        return {
-            "id": row["id"],
-            "date": row["date"],
-            "equipment": json.loads(row["equipment"]),
-            "workout_plan": json.loads(row["workout_plan"]),
-            "location": row["location"],
-            "completed": bool(row["completed"]),
-        }
+        return _row_to_workout(row)
 
 
 def update_workout(
@@ -241,11 +278,11 @@ def update_workout(
 
         if equipment is not None:
             updates.append("equipment = ?")
-            values.append(json.dumps(equipment))
+            values.append(orjson.dumps(equipment).decode())
 
         if workout_plan is not None:
             updates.append("workout_plan = ?")
-            values.append(json.dumps(workout_plan))
+            values.append(orjson.dumps(workout_plan).decode())
 
         if location is not None:
             updates.append("location = ?")
@@ -268,18 +305,18 @@ def update_workout(
 def delete_workout(workout_id: int) -> bool:
     """Delete workout by ID. Returns True if successful."""
     try:
-        logger.info(f"Deleting workout ID: {workout_id}")
+        logger.info("Deleting workout ID: %s", workout_id)
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM workouts WHERE id = ?", (workout_id,))
             success = bool(cursor.rowcount > 0)
             if success:
-                logger.info(f"Workout {workout_id} deleted successfully")
+                logger.info("Workout %s deleted successfully", workout_id)
             else:
-                logger.warning(f"Workout {workout_id} not found for deletion")
+                logger.warning("Workout %s not found for deletion", workout_id)
             return success
     except Exception as e:
-        logger.error(f"Failed to delete workout {workout_id}: {str(e)}", exc_info=True)
+        logger.error("Failed to delete workout %s: %s", workout_id, e, exc_info=True)
         raise DatabaseError(
             message=f"Failed to delete workout: {str(e)}",
             operation="delete_workout",
@@ -292,7 +329,7 @@ def save_equipment_detection(
 ) -> int:
     """Save equipment detection result. Returns detection ID."""
     timestamp = datetime.now().isoformat()
-    equipment_json = json.dumps(detected_equipment)
+    equipment_json = orjson.dumps(detected_equipment).decode()
 
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -332,18 +369,49 @@ def save_llm_log(
         return int(cursor.lastrowid) if cursor.lastrowid else 0
 
 
+def save_llm_logs_bulk(logs: List[Dict[str, Any]]) -> int:
+    """Save many LLM call logs (save_llm_log kwargs plus created_at) in one transaction."""
+    rows = [
+        (
+            log["agent_name"],
+            log["model"],
+            log["status"],
+            log.get("tokens_in", 0),
+            log.get("tokens_out", 0),
+            log.get("time_ms", 0),
+            log.get("error_message"),
+            log.get("created_at") or datetime.now().isoformat(),
+        )
+        for log in logs
+    ]
+
+    with get_db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO llm_logs
+            (agent_name, model, status, tokens_in, tokens_out, time_ms, error_message, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+    return len(rows)
+
+
 def get_llm_stats() -> Dict:
     """Get aggregated LLM usage statistics."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
-        # Overall statistics
-        cursor.execute("SELECT COUNT(*) as total FROM llm_logs")
+        # Overall statistics; cache hits made no API call, so they are only counted separately
+        cursor.execute("SELECT COUNT(*) as total FROM llm_logs WHERE status != 'CACHE_HIT'")
         total_calls = cursor.fetchone()["total"]
 
         cursor.execute("SELECT COUNT(*) as total FROM llm_logs WHERE status = 'SUCCESS'")
         successful_calls = cursor.fetchone()["total"]
 
+        cursor.execute("SELECT COUNT(*) as total FROM llm_logs WHERE status = 'CACHE_HIT'")
+        cache_hits = cursor.fetchone()["total"]
+
         cursor.execute("SELECT SUM(tokens_in + tokens_out) as total FROM llm_logs")
         total_tokens = cursor.fetchone()["total"] or 0
 
@@ -358,6 +426,7 @@ def get_llm_stats() -> Dict:
                 SUM(tokens_in) as tokens_in_sum,
                 SUM(tokens_out) as tokens_out_sum
             FROM llm_logs
+            WHERE status != 'CACHE_HIT'
             GROUP BY agent_name
             ORDER BY call_count DESC
         """
@@ -385,6 +454,7 @@ def get_llm_stats() -> Dict:
                 SUM(tokens_in) as tokens_in_sum,
                 SUM(tokens_out) as tokens_out_sum
             FROM llm_logs
+            WHERE status != 'CACHE_HIT'
             GROUP BY model
             ORDER BY call_count DESC
         """
@@ -401,27 +471,15 @@ def get_llm_stats() -> Dict:
                 }
             )
 
-        # Calculate estimated cost
-        # GPT-4: $0.03/1K input, $0.06/1K output
-        # GPT-4o: $0.0025/1K input, $0.01/1K output
-        estimated_cost = 0.0
-        for model_stat in model_stats:
-            model = model_stat["model"]
-            tokens_in = model_stat["tokens_in"]
-            tokens_out = model_stat["tokens_out"]
-
-            if "gpt-4o" in model.lower():
-                cost = (tokens_in / 1000) * 0.0025 + (tokens_out / 1000) * 0.01
-            elif "gpt-4" in model.lower():
-                cost = (tokens_in / 1000) * 0.03 + (tokens_out / 1000) * 0.06
-            else:
-                # Default estimate
-                cost = ((tokens_in + tokens_out) / 1000) * 0.008
-            estimated_cost += cost
+        # Calculate estimated cost (see utils/pricing.py for rates)
+        estimated_cost = sum(
+            estimate_cost(m["model"], m["tokens_in"], m["tokens_out"]) for m in model_stats
+        )
 
         return {
             "total_calls": total_calls,
             "successful_calls": successful_calls,
+            "cache_hits": cache_hits,
             "total_tokens": total_tokens,
             "estimated_cost": round(estimated_cost, 4),
             "by_agent": agent_stats,
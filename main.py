@@ -1,22 +1,20 @@
 """Streamlit Chat UI for ROAMFIT with Strands."""
 import base64
 import re
-from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 import streamlit as st
-from PIL import Image
 
+from agents.graph_trends import generate_charts_bytes
 from agents.strands_orchestrator import create_roamfit_orchestrator
-from database import create_tables, get_last_workout, update_workout_completion
-
-# Initialize database tables
-create_tables()
+from database import get_last_workout, get_workout_signature, update_workout_completion
+from utils.ui import build_sidebar, ensure_db_ready, page_config
 
 # Page configuration
-st.set_page_config(
-    page_title="ROAMFIT", page_icon="💪", layout="wide", initial_sidebar_state="expanded"
-)
+page_config(page_title="ROAMFIT", page_icon="💪", initial_sidebar_state="expanded")
+
+# Initialize database tables
+ensure_db_ready()
 
 
 # Initialize orchestrator (cached)
@@ -26,44 +24,31 @@ def get_orchestrator():
     return create_roamfit_orchestrator()
 
 
-# Initialize chat history
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+@st.cache_data(ttl=5, show_spinner=False)
+def cached_workout_signature() -> Tuple[int, Optional[str]]:
+    """Cheap (total_workouts, last_workout_date) lookup shared across reruns."""
+    return get_workout_signature()
 
-if "orchestrator" not in st.session_state:
-    st.session_state.orchestrator = get_orchestrator()
 
+@st.cache_data(ttl=60, max_entries=8, show_spinner=False)
+def render_chart(chart_type: str, signature: Tuple[int, Optional[str]]) -> Tuple[bytes, str]:
+    """Render a chart, reusing the PNG while the workout signature is unchanged."""
+    # signature is only part of the cache key; edits that keep it unchanged expire via ttl
+    return generate_charts_bytes(chart_type)
 
-# Sidebar
-with st.sidebar:
-    st.header("⚙️ ROAMFIT")
-    st.markdown("**Multi-agentic fitness assistant**")
 
-    st.divider()
-    st.markdown("### 📖 About")
-    st.markdown(
-        """
-    ROAMFIT helps you maintain your fitness routine while traveling.
+def decode_chart(chart: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode a base64 chart payload (remote MCP response) into raw PNG bytes once."""
+    return {
+        "chart_type": chart.get("chart_type", "chart"),
+        "image_bytes": base64.b64decode(chart["image_base64"]),
+    }
 
-    **Capabilities:**
-    - 📷 Detect equipment from photos
-    - 🏋️ Generate personalized workouts
-    - 📊 Track your progress
-    - 📍 Find nearby gyms and tracks
 
-    **How to use:**
-    - Upload a photo of equipment
-    - Ask to generate a workout
-    - Chat naturally with the assistant
-    """
-    )
+# Initialize chat history
+st.session_state.setdefault("messages", [])
 
-    st.divider()
-    if st.button(
-        "🗑️ Clear Chat", use_container_width=True
-    ):  # use_container_width still works for buttons
-        st.session_state.messages = []
-        st.rerun()
+build_sidebar()
 
 
 # Main chat interface
@@ -80,12 +65,14 @@ for message in st.session_state.messages:
             st.image(message["image"], caption="Uploaded image", width="stretch")
 
         # Display chart if present
-        if "chart" in message and "image_base64" in message["chart"]:
+        if "chart" in message and "image_bytes" in message["chart"]:
             try:
-                chart_image = base64.b64decode(message["chart"]["image_base64"])
-                chart_img = Image.open(BytesIO(chart_image))
                 chart_type = message["chart"].get("chart_type", "Chart")
-                st.image(chart_img, caption=f"{chart_type.title()} Chart", width="stretch")
+                st.image(
+                    message["chart"]["image_bytes"],
+                    caption=f"{chart_type.title()} Chart",
+                    width="stretch",
+                )
             except Exception:
                 pass
 
@@ -102,19 +89,18 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
     # Add user message to chat
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    # Handle image if uploaded
-    image_base64 = None
+    # Handle image if uploaded (getvalue() reads once without consuming the stream)
+    image_data = None
     if uploaded_file:
-        image_data = uploaded_file.read()
-        image_base64 = base64.b64encode(image_data).decode("utf-8")
+        image_data = uploaded_file.getvalue()
 
-        # Add image to message
-        st.session_state.messages[-1]["image"] = uploaded_file
+        # Store raw bytes, not the UploadedFile, so session state stays pickle-safe
+        st.session_state.messages[-1]["image"] = image_data
 
         # Display user message with image
         with st.chat_message("user"):
             st.markdown(prompt)
-            st.image(uploaded_file, caption="Uploaded image", width="stretch")
+            st.image(image_data, caption="Uploaded image", width="stretch")
     else:
         # Display user message
         with st.chat_message("user"):
@@ -125,15 +111,14 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
 
     # If image is provided, detect equipment first (before calling orchestrator)
     # This avoids including the large base64 string in the LLM prompt
-    if image_base64:
+    if image_data:
         try:
             import os
             import tempfile
 
             from agents.equipment_detection import detect_equipment
 
-            # Decode base64 and save to temp file
-            image_data = base64.b64decode(image_base64)
+            # Save to temp file for the vision call
             with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
                 tmp_file.write(image_data)
                 tmp_path = tmp_file.name
@@ -167,17 +152,15 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
 
                 # Use the query (already cleaned - no base64 included)
                 # The orchestrator LLM will decide which agents to call based on the query
-                response = st.session_state.orchestrator(query)
+                response = get_orchestrator()(query)
                 response_str = str(response)
 
                 # Try to parse chart data from response
-                chart_data = None
+                chart_data: Optional[Dict[str, Any]] = None
                 chart_type = None
                 try:
                     import json
 
-                    from agents.graph_trends import generate_charts
-
                     # First, try to parse as complete JSON response
                     try:
                         parsed = json.loads(response_str)
@@ -186,23 +169,29 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
                             if "has_chart" in parsed and parsed["has_chart"]:
                                 chart_type = parsed.get("chart_type", "frequency")
                                 # Generate chart directly in UI (don't pass through LLM)
-                                chart_data = generate_charts(chart_type=chart_type)
+                                png_bytes, chart_type = render_chart(
+                                    chart_type, cached_workout_signature()
+                                )
+                                chart_data = {"chart_type": chart_type, "image_bytes": png_bytes}
                                 response_str = parsed.get("text", response_str)
                                 # Remove the chart marker from text
                                 response_str = re.sub(r"\[CHART:[^\]]+\]", "", response_str).strip()
                             elif "chart" in parsed and "image_base64" in parsed["chart"]:
-                                chart_data = parsed["chart"]
+                                chart_data = decode_chart(parsed["chart"])
                                 response_str = parsed.get("text", response_str)
                             elif "image_base64" in parsed:
                                 # Direct chart dict
-                                chart_data = parsed
+                                chart_data = decode_chart(parsed)
                     except json.JSONDecodeError:
                         # Not valid JSON, check for chart reference marker in text
                         chart_match = re.search(r"\[CHART:([^\]]+)\]", response_str)
                         if chart_match:
                             chart_type = chart_match.group(1)
                             # Generate chart directly in UI
-                            chart_data = generate_charts(chart_type=chart_type)
+                            png_bytes, chart_type = render_chart(
+                                chart_type, cached_workout_signature()
+                            )
+                            chart_data = {"chart_type": chart_type, "image_bytes": png_bytes}
                             # Remove marker from text
                             response_str = re.sub(r"\[CHART:[^\]]+\]", "", response_str).strip()
                         else:
@@ -215,7 +204,7 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
                             if json_match:
                                 parsed = json.loads(json_match.group())
                                 if "chart" in parsed and "image_base64" in parsed["chart"]:
-                                    chart_data = parsed["chart"]
+                                    chart_data = decode_chart(parsed["chart"])
                                     response_str = parsed.get(
                                         "text", response_str.replace(json_match.group(), "").strip()
                                     )
@@ -227,12 +216,10 @@ if prompt := st.chat_input("Ask about workouts, upload a photo, or request a wor
                 st.markdown(response_str)
 
                 # Display chart if available
-                if chart_data and "image_base64" in chart_data:
+                if chart_data and "image_bytes" in chart_data:
                     try:
-                        chart_image = base64.b64decode(chart_data["image_base64"])
-                        chart_img = Image.open(BytesIO(chart_image))
                         st.image(
-                            chart_img,
+                            chart_data["image_bytes"],
                             caption=f"{chart_data.get('chart_type', 'Chart').title()} Chart",
                             width="stretch",
                         )
@@ -5,10 +5,6 @@ import tempfile
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 from mcp.server.fastmcp import FastMCP
 
 from agents.equipment_detection import detect_equipment
@@ -1,12 +1,8 @@
 """Graph/Trends MCP Server for ROAMFIT."""
+import asyncio
 import sys
-from pathlib import Path
 from typing import Any, Dict
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 from mcp.server.fastmcp import FastMCP
 
 from agents.graph_trends import generate_charts, get_workout_stats
@@ -40,6 +36,25 @@ async def generate_charts_tool(chart_type: str = "frequency") -> Dict[str, str]:
     return generate_charts(chart_type=chart_type)
 
 
+@mcp.tool()
+async def get_progress_bundle_tool(chart_type: str = "frequency") -> Dict[str, Any]:
+    """
+    Get workout statistics and a progress chart in a single call.
+
+    Args:
+        chart_type: Type of chart ("frequency" or "equipment", default: "frequency")
+
+    Returns:
+        Dict with stats (see get_workout_stats_tool) and chart (see generate_charts_tool)
+    """
+    # Overlap the stats queries with chart rendering instead of two serial round-trips
+    stats, chart = await asyncio.gather(
+        asyncio.to_thread(get_workout_stats),
+        asyncio.to_thread(generate_charts, chart_type=chart_type),
+    )
+    return {"stats": stats, "chart": chart}
+
+
 def main() -> None:
     """Run the MCP server on stdio."""
     print("Starting Graph/Trends MCP server on stdio...", file=sys.stderr)
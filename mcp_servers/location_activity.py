@@ -1,18 +1,55 @@
 """Location Activity MCP Server for ROAMFIT."""
+import asyncio
 import sys
-from pathlib import Path
-from typing import Any, Dict, List
-
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
 
+from cachetools import TTLCache
 from mcp.server.fastmcp import FastMCP
 
 from agents.location_activity import find_nearby_gyms, find_running_tracks
 
 mcp = FastMCP("location_activity")
 
+SearchResults = List[Dict[str, Any]]
+SearchKey = Tuple[Any, ...]
+
+# Identical searches within 10 minutes reuse the geocoding/search results
+_search_cache: "TTLCache[SearchKey, SearchResults]" = TTLCache(maxsize=512, ttl=600)
+# One lock per in-progress search, with the number of callers holding or awaiting it
+_search_locks: Dict[SearchKey, asyncio.Lock] = {}
+_search_lock_users: Counter = Counter()
+
+
+async def _cached_search(
+    search: Callable[..., SearchResults], location: str, radius_km: float, limit: int
+) -> SearchResults:
+    """Run a location search once per (query, radius, limit), sharing it with concurrent callers."""
+    key = (search.__name__, location.strip().lower(), round(radius_km, 3), limit)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    lock = _search_locks.setdefault(key, asyncio.Lock())
+    _search_lock_users[key] += 1
+    try:
+        async with lock:
+            results = _search_cache.get(key)
+            if results is None:
+                results = await asyncio.to_thread(
+                    search, location=location, radius_km=radius_km, limit=limit
+                )
+                # Lookup failures come back as [], so only keep non-empty results
+                if results:
+                    _search_cache[key] = results
+    finally:
+        # Drop the lock only once no caller holds or awaits it, so every waiter shares it
+        _search_lock_users[key] -= 1
+        if not _search_lock_users[key]:
+            del _search_lock_users[key]
+            del _search_locks[key]
+    return results
+
 
 @mcp.tool()
 async def find_nearby_gyms_tool(
@@ -29,7 +66,7 @@ async def find_nearby_gyms_tool(
     Returns:
         List of gyms with name, address, distance, coordinates
     """
-    return find_nearby_gyms(location=location, radius_km=radius_km, limit=limit)
+    return await _cached_search(find_nearby_gyms, location, radius_km, limit)
 
 
 @mcp.tool()
@@ -47,7 +84,7 @@ async def find_running_tracks_tool(
     Returns:
         List of locations with name, address, distance, coordinates
     """
-    return find_running_tracks(location=location, radius_km=radius_km, limit=limit)
+    return await _cached_search(find_running_tracks, location, radius_km, limit)
 
 
 def main() -> None:
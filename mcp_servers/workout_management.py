@@ -1,12 +1,7 @@
 """Workout Management MCP Server for ROAMFIT."""
 import sys
-from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 from mcp.server.fastmcp import FastMCP
 
 from agents.workout_management import (
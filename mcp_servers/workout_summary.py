@@ -1,12 +1,8 @@
 """Workout Summary MCP Server for ROAMFIT."""
+import asyncio
 import sys
-from pathlib import Path
 from typing import Any, Dict, Optional
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 from mcp.server.fastmcp import FastMCP
 
 from agents.workout_summary import get_last_workout, summarize_workout_history
@@ -22,7 +18,7 @@ async def get_last_workout_tool() -> Optional[Dict[str, Any]]:
     Returns:
         Dict with workout details or None if no workouts exist
     """
-    return get_last_workout()
+    return await asyncio.to_thread(get_last_workout)
 
 
 @mcp.tool()
@@ -36,7 +32,7 @@ async def summarize_workout_history_tool(limit: int = 5) -> Dict[str, Any]:
     Returns:
         Dict with summary, last_workout_date, and total_workouts
     """
-    return summarize_workout_history(limit=limit)
+    return await asyncio.to_thread(summarize_workout_history, limit=limit)
 
 
 def main() -> None:
@@ -1,12 +1,18 @@
 """Models module for ROAMFIT."""
 from models.schemas import (
+    AgentResponse,
     ChartData,
     EquipmentDetection,
+    EquipmentDetectionResponse,
     Exercise,
+    GraphTrendsResponse,
     Location,
+    LocationActivityResponse,
+    WorkoutGeneratorResponse,
     WorkoutHistory,
     WorkoutPlan,
     WorkoutStats,
+    WorkoutSummaryResponse,
 )
 
 __all__ = [
@@ -17,4 +23,10 @@ __all__ = [
     "ChartData",
     "Location",
     "EquipmentDetection",
+    "AgentResponse",
+    "EquipmentDetectionResponse",
+    "WorkoutSummaryResponse",
+    "WorkoutGeneratorResponse",
+    "GraphTrendsResponse",
+    "LocationActivityResponse",
 ]
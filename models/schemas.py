@@ -1,9 +1,20 @@
 """Data models/schemas for ROAMFIT."""
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 
-@dataclass
+def _intern(value: Any) -> Any:
+    """Intern enum-like strings so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    """Coerce an optional numeric field once at load time."""
+    return None if value is None else int(value)
+
+
+@dataclass(slots=True)
 class Exercise:
     """Represents a single exercise in a workout."""
 
@@ -13,8 +24,21 @@ class Exercise:
     sets: Optional[int] = None  # Optional for CrossFit formats
     rest_seconds: Optional[int] = None  # Optional for CrossFit formats
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary, omitting unset optional fields."""
+        result: Dict[str, Any] = {
+            "name": self.name,
+            "reps": self.reps,
+            "instructions": self.instructions,
+        }
+        if self.sets is not None:
+            result["sets"] = self.sets
+        if self.rest_seconds is not None:
+            result["rest_seconds"] = self.rest_seconds
+        return result
 
-@dataclass
+
+@dataclass(slots=True)
 class WorkoutPlan:
     """Represents a complete CrossFit-style workout plan."""
 
@@ -28,12 +52,9 @@ class WorkoutPlan:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        result = {
+        result: Dict[str, Any] = {
             "format": self.format,
-            "exercises": [
-                {"name": ex.name, "reps": ex.reps, "instructions": ex.instructions}
-                for ex in self.exercises
-            ],
+            "exercises": [ex.to_dict() for ex in self.exercises],
             "duration_minutes": self.duration_minutes,
             "focus": self.focus,
         }
@@ -44,39 +65,35 @@ class WorkoutPlan:
             result["warmup"] = self.warmup
         if self.cooldown:
             result["cooldown"] = self.cooldown
-        # Add optional exercise fields if present
-        for i, ex in enumerate(self.exercises):
-            if ex.sets is not None:
-                result["exercises"][i]["sets"] = ex.sets  # type: ignore[index]
-            if ex.rest_seconds is not None:
-                result["exercises"][i]["rest_seconds"] = ex.rest_seconds  # type: ignore[index]
         return result
 
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "WorkoutPlan":
-        """Create from dictionary."""
-        exercises = [
-            Exercise(
+    @staticmethod
+    def iter_exercises(raw: Iterable[Dict[str, Any]]) -> Iterator[Exercise]:
+        """Lazily build Exercise objects from raw exercise dicts, normalizing int fields."""
+        for ex in raw:
+            yield Exercise(
                 name=ex["name"],
-                reps=ex["reps"],
+                reps=int(ex["reps"]),
                 instructions=ex["instructions"],
-                sets=ex.get("sets"),
-                rest_seconds=ex.get("rest_seconds"),
+                sets=_optional_int(ex.get("sets")),
+                rest_seconds=_optional_int(ex.get("rest_seconds")),
             )
-            for ex in data.get("exercises", [])
-        ]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkoutPlan":
+        """Create from dictionary."""
         return cls(
-            format=data.get("format", "AMRAP"),
-            exercises=exercises,
+            format=_intern(data.get("format", "AMRAP")),
+            exercises=list(cls.iter_exercises(data.get("exercises", []))),
             duration_minutes=data.get("duration_minutes", 20),
-            focus=data.get("focus", "full_body"),
+            focus=_intern(data.get("focus", "full_body")),
             workout_description=data.get("workout_description"),
             warmup=data.get("warmup"),
             cooldown=data.get("cooldown"),
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WorkoutHistory:
     """Represents workout history summary."""
 
@@ -93,7 +110,7 @@ class WorkoutHistory:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WorkoutStats:
     """Represents workout statistics."""
 
@@ -114,7 +131,7 @@ class WorkoutStats:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChartData:
     """Represents chart/graph data."""
 
@@ -131,7 +148,7 @@ class ChartData:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Location:
     """Represents a location (gym, track, etc.)."""
 
@@ -140,7 +157,11 @@ class Location:
     latitude: float
     longitude: float
     distance_km: float
-    distance_m: int = 0
+
+    @property
+    def distance_m(self) -> int:
+        """Distance in whole meters, derived from distance_km."""
+        return round(self.distance_km * 1000)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -149,12 +170,12 @@ class Location:
             "address": self.address,
             "latitude": self.latitude,
             "longitude": self.longitude,
-            "distance_km": self.distance_km,
+            "distance_km": round(self.distance_km, 2),
             "distance_m": self.distance_m,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class EquipmentDetection:
     """Represents equipment detection result."""
 
@@ -181,7 +202,8 @@ class EquipmentDetection:
 
 
 # Agent Response Dataclasses
-@dataclass
+# Each subclass builds its dict in one literal rather than extending the base dict.
+@dataclass(slots=True)
 class AgentResponse:
     """Base class for agent responses."""
 
@@ -193,7 +215,7 @@ class AgentResponse:
         return {"success": self.success, "message": self.message, "data": self.data}
 
 
-@dataclass
+@dataclass(slots=True)
 class EquipmentDetectionResponse(AgentResponse):
     """Response from equipment detection agent."""
 
@@ -202,14 +224,17 @@ class EquipmentDetectionResponse(AgentResponse):
     location: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result.update(
-            {"equipment": self.equipment, "image_path": self.image_path, "location": self.location}
-        )
-        return result
+        return {
+            "success": self.success,
+            "message": self.message,
+            "data": self.data,
+            "equipment": self.equipment,
+            "image_path": self.image_path,
+            "location": self.location,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkoutSummaryResponse(AgentResponse):
     """Response from workout summary agent."""
 
@@ -218,18 +243,17 @@ class WorkoutSummaryResponse(AgentResponse):
     total_workouts: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result.update(
-            {
-                "summary": self.summary,
-                "last_workout_date": self.last_workout_date,
-                "total_workouts": self.total_workouts,
-            }
-        )
-        return result
+        return {
+            "success": self.success,
+            "message": self.message,
+            "data": self.data,
+            "summary": self.summary,
+            "last_workout_date": self.last_workout_date,
+            "total_workouts": self.total_workouts,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkoutGeneratorResponse(AgentResponse):
     """Response from workout generator agent."""
 
@@ -237,12 +261,16 @@ class WorkoutGeneratorResponse(AgentResponse):
     workout_id: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result.update({"workout_plan": self.workout_plan, "workout_id": self.workout_id})
-        return result
+        return {
+            "success": self.success,
+            "message": self.message,
+            "data": self.data,
+            "workout_plan": self.workout_plan,
+            "workout_id": self.workout_id,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphTrendsResponse(AgentResponse):
     """Response from graph/trends agent."""
 
@@ -251,14 +279,17 @@ class GraphTrendsResponse(AgentResponse):
     chart_data: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result.update(
-            {"stats": self.stats, "chart_type": self.chart_type, "chart_data": self.chart_data}
-        )
-        return result
+        return {
+            "success": self.success,
+            "message": self.message,
+            "data": self.data,
+            "stats": self.stats,
+            "chart_type": self.chart_type,
+            "chart_data": self.chart_data,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class LocationActivityResponse(AgentResponse):
     """Response from location activity agent."""
 
@@ -266,6 +297,10 @@ class LocationActivityResponse(AgentResponse):
     location_query: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        result = super().to_dict()
-        result.update({"locations": self.locations, "location_query": self.location_query})
-        return result
+        return {
+            "success": self.success,
+            "message": self.message,
+            "data": self.data,
+            "locations": self.locations,
+            "location_query": self.location_query,
+        }
@@ -1,23 +1,40 @@
 """LLM Monitoring Dashboard for ROAMFIT."""
+from typing import Any, Dict
+
+import pandas as pd
 import streamlit as st
 
-from database import create_tables, get_llm_stats
+from database import get_llm_stats
+from utils.pricing import DEFAULT_RATES, get_model_rates
+from utils.ui import ensure_db_ready, page_config
+
+
+def token_cost(df: pd.DataFrame, rate_in: Any, rate_out: Any) -> pd.Series:
+    """Vectorized USD cost per row; rates (per 1K tokens) may be scalars or Series."""
+    return (df["tokens_in"] * rate_in + df["tokens_out"] * rate_out) / 1000
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_llm_stats() -> Dict[str, Any]:
+    """LLM usage stats, re-queried at most every 30s instead of on every rerun."""
+    return get_llm_stats()
+
 
 # Page configuration
-st.set_page_config(page_title="LLM Monitoring - ROAMFIT", page_icon="📊", layout="wide")
+page_config(page_title="LLM Monitoring - ROAMFIT", page_icon="📊")
 
-# Initialize database tables if needed
-create_tables()
+# Initialize database tables
+ensure_db_ready()
 
 st.title("📊 LLM Usage Statistics")
 st.markdown("Monitor token usage and costs for all LLM API calls")
 
 # Get statistics
 try:
-    stats = get_llm_stats()
+    stats = cached_llm_stats()
 
     # Overall statistics cards
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
         st.metric("Total API Calls", stats["total_calls"])
@@ -26,9 +43,12 @@ try:
         st.metric("Successful Calls", stats["successful_calls"])
 
     with col3:
-        st.metric("Total Tokens", f"{stats['total_tokens']:,}")
+        st.metric("Cache Hits", stats["cache_hits"])
 
     with col4:
+        st.metric("Total Tokens", f"{stats['total_tokens']:,}")
+
+    with col5:
         st.metric("Estimated Cost", f"${stats['estimated_cost']:.4f}")
 
     st.divider()
@@ -36,25 +56,22 @@ try:
     # Breakdown by Agent
     st.subheader("📈 Breakdown by Agent")
     if stats["by_agent"]:
-        # Create table data
-        agent_data = []
-        for agent in stats["by_agent"]:
-            # Calculate cost for this agent
-            # We'll use average pricing since we don't track model per agent
-            tokens = agent["tokens_used"]
-            estimated_cost = (tokens / 1000) * 0.008  # Average estimate
-
-            agent_data.append(
-                {
-                    "Agent": agent["agent_name"],
-                    "Calls": agent["call_count"],
-                    "Tokens": f"{agent['tokens_used']:,}",
-                    "Avg Time (ms)": f"{agent['avg_time_ms']:.2f}",
-                    "Cost": f"${estimated_cost:.4f}",
-                }
-            )
-
-        st.dataframe(agent_data, use_container_width=True, hide_index=True)
+        agents_df = pd.DataFrame(stats["by_agent"])
+        # We don't track model per agent, so use the default (average) rates
+        agents_df["cost"] = token_cost(agents_df, *DEFAULT_RATES)
+
+        st.dataframe(
+            agents_df[["agent_name", "call_count", "tokens_used", "avg_time_ms", "cost"]],
+            column_config={
+                "agent_name": "Agent",
+                "call_count": "Calls",
+                "tokens_used": st.column_config.NumberColumn("Tokens", format="localized"),
+                "avg_time_ms": st.column_config.NumberColumn("Avg Time (ms)", format="%.2f"),
+                "cost": st.column_config.NumberColumn("Cost", format="$%.4f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+        )
     else:
         st.info("No agent statistics available yet. Make some LLM calls first!")
 
@@ -63,32 +80,27 @@ try:
     # Breakdown by Model
     st.subheader("🤖 Breakdown by Model")
     if stats["by_model"]:
-        model_data = []
-        for model in stats["by_model"]:
-            # Calculate cost based on model
-            model_name = model["model"]
-            tokens_in = model["tokens_in"]
-            tokens_out = model["tokens_out"]
-
-            if "gpt-4o" in model_name.lower():
-                cost = (tokens_in / 1000) * 0.0025 + (tokens_out / 1000) * 0.01
-            elif "gpt-4" in model_name.lower():
-                cost = (tokens_in / 1000) * 0.03 + (tokens_out / 1000) * 0.06
-            else:
-                cost = ((tokens_in + tokens_out) / 1000) * 0.008
-
-            model_data.append(
-                {
-                    "Model": model_name,
-                    "Calls": model["call_count"],
-                    "Tokens In": f"{model['tokens_in']:,}",
-                    "Tokens Out": f"{model['tokens_out']:,}",
-                    "Total Tokens": f"{model['tokens_used']:,}",
-                    "Cost": f"${cost:.4f}",
-                }
-            )
-
-        st.dataframe(model_data, use_container_width=True, hide_index=True)
+        models_df = pd.DataFrame(stats["by_model"])
+        rates = pd.DataFrame(
+            models_df["model"].map(get_model_rates).tolist(),
+            columns=["rate_in", "rate_out"],
+            index=models_df.index,
+        )
+        models_df["cost"] = token_cost(models_df, rates["rate_in"], rates["rate_out"])
+
+        st.dataframe(
+            models_df[["model", "call_count", "tokens_in", "tokens_out", "tokens_used", "cost"]],
+            column_config={
+                "model": "Model",
+                "call_count": "Calls",
+                "tokens_in": st.column_config.NumberColumn("Tokens In", format="localized"),
+                "tokens_out": st.column_config.NumberColumn("Tokens Out", format="localized"),
+                "tokens_used": st.column_config.NumberColumn("Total Tokens", format="localized"),
+                "cost": st.column_config.NumberColumn("Cost", format="$%.4f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+        )
     else:
         st.info("No model statistics available yet. Make some LLM calls first!")
 
@@ -1,229 +1,299 @@
 """Workout History Page for ROAMFIT."""
+import re
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
 
 from database import (
-    create_tables,
     delete_workout,
     get_workout_history,
+    get_workout_signature,
     update_workout,
     update_workout_completion,
 )
+from utils.ui import ensure_db_ready, page_config
 
-# Page configuration
-st.set_page_config(page_title="Workout History - ROAMFIT", page_icon="📋", layout="wide")
+PAGE_SIZE = 5
+FORMAT_OPTIONS = ["EMOM", "AMRAP", "For Time", "Rounds for Time", "Tabata", "Chipper", "Other"]
+FORMAT_INDEX = {name: i for i, name in enumerate(FORMAT_OPTIONS)}
+# Comma separators with their surrounding whitespace, so items need no separate strip()
+_EQUIPMENT_SPLIT = re.compile(r"\s*,\s*")
 
-# Initialize database tables if needed
-create_tables()
 
-st.title("📋 Workout History")
-st.markdown("View and manage your saved workouts")
+@lru_cache(maxsize=1024)
+def format_date(value: str) -> str:
+    """Format an ISO timestamp for display; each distinct value is parsed once per process."""
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M")
+    except (ValueError, TypeError):
+        return value
+
+
+def with_display_fields(workout: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the display strings the cards need, so reruns only read dict keys."""
+    workout_plan = workout["workout_plan"]
+    return {
+        **workout,
+        "_equipment_str": ", ".join(workout["equipment"]),
+        "_date_str": format_date(workout["date"]),
+        "_format_name": workout_plan.get("format", "Unknown"),
+        "_description": workout_plan.get("workout_description", "No description"),
+    }
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_workout_history(
+    limit: int, offset: int, signature: Tuple[int, Optional[str]]
+) -> List[Dict[str, Any]]:
+    """One page of workout history reused across reruns; cleared after every mutation."""
+    # signature picks up workouts added elsewhere (e.g. from the chat) without waiting for ttl
+    return [with_display_fields(w) for w in get_workout_history(limit=limit, offset=offset)]
+
+
+# Button callbacks run before the fragment reruns, so the click needs no extra st.rerun()
+def set_completed(workout_id: int, completed: bool) -> None:
+    """Mark a workout complete or incomplete."""
+    if update_workout_completion(workout_id, completed=completed):
+        cached_workout_history.clear()
+        st.toast("Workout marked as completed! 🎉" if completed else "Workout marked as incomplete")
+    else:
+        st.toast("Failed to update workout status", icon="⚠️")
+
+
+def remove_workout(workout_id: int) -> None:
+    """Delete a workout."""
+    if delete_workout(workout_id):
+        cached_workout_history.clear()
+        st.toast("Workout deleted! 🗑️")
+    else:
+        st.toast("Failed to delete workout", icon="⚠️")
 
-# Get workout history
-try:
-    workouts = get_workout_history(limit=20)
 
-    if not workouts:
-        st.info("No workouts saved yet. Generate a workout to see it here!")
+def set_editing(workout_id: int, editing: bool) -> None:
+    """Enter or leave edit mode for a workout."""
+    st.session_state[f"edit_{workout_id}"] = editing
+
+
+def save_edits(workout: Dict[str, Any]) -> None:
+    """Save the submitted edit form, writing only the fields that changed."""
+    state = st.session_state
+    workout_id = workout["id"]
+    workout_plan = workout.get("workout_plan", {})
+
+    # Parse equipment
+    equipment_text = state[f"equipment_{workout_id}"].strip()
+    equipment_list = [e for e in _EQUIPMENT_SPLIT.split(equipment_text) if e]
+    location_text = state[f"location_{workout_id}"]
+
+    # Update workout plan
+    updated_plan = workout_plan.copy()
+    updated_plan["format"] = state[f"format_{workout_id}"]
+    updated_plan["duration_minutes"] = state[f"duration_{workout_id}"]
+    updated_plan["workout_description"] = state[f"description_{workout_id}"]
+
+    # Unchanged fields are left out so update_workout skips re-encoding their JSON
+    changes: Dict[str, Any] = {}
+    if equipment_list != workout.get("equipment", []):
+        changes["equipment"] = equipment_list
+    if updated_plan != workout_plan:
+        changes["workout_plan"] = updated_plan
+    if location_text and location_text != workout.get("location"):
+        changes["location"] = location_text
+
+    if not changes:
+        set_editing(workout_id, False)
+        st.toast("No changes to save")
+        return
+
+    if update_workout(workout_id=workout_id, **changes):
+        cached_workout_history.clear()
+        set_editing(workout_id, False)
+        st.toast("Workout updated successfully! 🎉")
     else:
-        st.metric("Total Workouts", len(workouts))
+        st.toast("Failed to update workout", icon="⚠️")
+
+
+def load_more() -> None:
+    """Show one more page of workouts."""
+    st.session_state.history_pages += 1
+
+
+def render_edit_form(workout: Dict[str, Any]) -> None:
+    """Render the edit form for a workout; only rows in edit mode build these widgets."""
+    workout_id = workout["id"]
+
+    st.markdown(f"### ✏️ Editing Workout #{workout_id}")
+
+    with st.form(key=f"edit_form_{workout_id}"):
+        # Equipment
+        st.text_input(
+            "Equipment (comma-separated)",
+            value=workout["_equipment_str"],
+            key=f"equipment_{workout_id}",
+        )
+
+        # Location
+        st.text_input(
+            "Location",
+            value=workout["location"] or "",
+            key=f"location_{workout_id}",
+        )
+
+        # Workout description
+        st.text_area(
+            "Workout Description",
+            value=workout["_description"],
+            key=f"description_{workout_id}",
+        )
+
+        # Format
+        st.selectbox(
+            "Format",
+            FORMAT_OPTIONS,
+            index=FORMAT_INDEX.get(workout["_format_name"], 0),
+            key=f"format_{workout_id}",
+        )
+
+        # Duration
+        st.number_input(
+            "Duration (minutes)",
+            min_value=1,
+            max_value=120,
+            value=workout["workout_plan"].get("duration_minutes", 20),
+            key=f"duration_{workout_id}",
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.form_submit_button(
+                "💾 Save Changes",
+                on_click=save_edits,
+                args=(workout,),
+                use_container_width=True,
+            )
+        with col2:
+            st.form_submit_button(
+                "❌ Cancel",
+                on_click=set_editing,
+                args=(workout_id, False),
+                use_container_width=True,
+            )
+
+
+def render_workout_card(workout: Dict[str, Any]) -> None:
+    """Render a workout in view mode with its action buttons."""
+    workout_id = workout["id"]
+    completed = workout["completed"]
+
+    info_col, actions_col = st.columns([4, 3])
+
+    with info_col:
+        # Display workout info as one markdown element instead of one per line
+        status_icon = "✅" if completed else "⏳"
+        sections = [
+            f"### {status_icon} Workout #{workout_id} - {workout['_format_name']}",
+            f"**Date:** {workout['_date_str']}",
+            f"**Equipment:** {workout['_equipment_str']}",
+        ]
+        if workout["location"]:
+            sections.append(f"**Location:** {workout['location']}")
+        sections.append(f"**Description:** {workout['_description']}")
+
+        # Show exercises if available
+        exercises = workout["workout_plan"].get("exercises", [])
+        if exercises:
+            sections.append(
+                "**Exercises:**\n"
+                + "\n".join(
+                    f"- {ex.get('name', 'Unknown')}: {ex.get('reps', 0)} reps" for ex in exercises
+                )
+            )
+        st.markdown("\n\n".join(sections))
+
+    with actions_col:
+        if completed:
+            st.success("✅ Completed")
+        else:
+            st.info("⏳ Pending")
+
+        # One horizontal action bar instead of nested column layouts
+        with st.container(horizontal=True):
+            if not completed:
+                st.button(
+                    "✅ Complete",
+                    key=f"complete_{workout_id}",
+                    on_click=set_completed,
+                    args=(workout_id, True),
+                )
+            else:
+                st.button(
+                    "↩️ Incomplete",
+                    key=f"incomplete_{workout_id}",
+                    on_click=set_completed,
+                    args=(workout_id, False),
+                )
+            st.button(
+                "✏️",
+                key=f"edit_btn_{workout_id}",
+                help="Edit workout",
+                on_click=set_editing,
+                args=(workout_id, True),
+            )
+            st.button(
+                "🗑️",
+                key=f"delete_btn_{workout_id}",
+                help="Delete workout",
+                on_click=remove_workout,
+                args=(workout_id,),
+            )
+
+
+@st.fragment
+def render_history() -> None:
+    """Render the workout list; its widgets rerun only this fragment, not the whole page."""
+    try:
+        signature = get_workout_signature()
+        pages = st.session_state.setdefault("history_pages", 1)
+        workouts = [
+            workout
+            for page in range(pages)
+            for workout in cached_workout_history(PAGE_SIZE, page * PAGE_SIZE, signature)
+        ]
+
+        if not workouts:
+            st.info("No workouts saved yet. Generate a workout to see it here!")
+            return
+
+        total_workouts = signature[0]
+        st.metric("Total Workouts", total_workouts)
         st.divider()
 
         for workout in workouts:
             with st.container():
                 workout_id = workout["id"]
-
-                # Check if this workout is being edited
-                edit_key = f"edit_{workout_id}"
-                if edit_key not in st.session_state:
-                    st.session_state[edit_key] = False
-
-                    # Parse date
-                    try:
-                        date_obj = datetime.fromisoformat(workout["date"])
-                        date_str = date_obj.strftime("%Y-%m-%d %H:%M")
-                    except (ValueError, TypeError):
-                        date_str = workout["date"]
-
-                # Get workout plan
-                workout_plan = workout.get("workout_plan", {})
-                format_name = workout_plan.get("format", "Unknown")
-                description = workout_plan.get("workout_description", "No description")
-
-                if st.session_state[edit_key]:
-                    # Edit mode
-                    st.markdown(f"### ✏️ Editing Workout #{workout_id}")
-
-                    with st.form(key=f"edit_form_{workout_id}"):
-                        # Equipment
-                        equipment_text = st.text_input(
-                            "Equipment (comma-separated)",
-                            value=", ".join(workout.get("equipment", [])),
-                            key=f"equipment_{workout_id}",
-                        )
-
-                        # Location
-                        location_text = st.text_input(
-                            "Location",
-                            value=workout.get("location", "") or "",
-                            key=f"location_{workout_id}",
-                        )
-
-                        # Workout description
-                        description_text = st.text_area(
-                            "Workout Description",
-                            value=description,
-                            key=f"description_{workout_id}",
-                        )
-
-                        # Format
-                        format_options = [
-                            "EMOM",
-                            "AMRAP",
-                            "For Time",
-                            "Rounds for Time",
-                            "Tabata",
-                            "Chipper",
-                            "Other",
-                        ]
-                        format_index = (
-                            format_options.index(format_name)
-                            if format_name in format_options
-                            else 0
-                        )
-                        selected_format = st.selectbox(
-                            "Format", format_options, index=format_index, key=f"format_{workout_id}"
-                        )
-
-                        # Duration
-                        duration = st.number_input(
-                            "Duration (minutes)",
-                            min_value=1,
-                            max_value=120,
-                            value=workout_plan.get("duration_minutes", 20),
-                            key=f"duration_{workout_id}",
-                        )
-
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            save_btn = st.form_submit_button(
-                                "💾 Save Changes", use_container_width=True
-                            )
-                        with col2:
-                            cancel_btn = st.form_submit_button(
-                                "❌ Cancel", use_container_width=True
-                            )
-
-                        if save_btn:
-                            # Parse equipment
-                            equipment_list = [
-                                e.strip() for e in equipment_text.split(",") if e.strip()
-                            ]
-
-                            # Update workout plan
-                            updated_plan = workout_plan.copy()
-                            updated_plan["format"] = selected_format
-                            updated_plan["duration_minutes"] = duration
-                            updated_plan["workout_description"] = description_text
-
-                            # Update workout
-                            if update_workout(
-                                workout_id=workout_id,
-                                equipment=equipment_list,
-                                workout_plan=updated_plan,
-                                location=location_text if location_text else None,
-                            ):
-                                st.success("Workout updated successfully! 🎉")
-                                st.session_state[edit_key] = False
-                                st.rerun()
-                            else:
-                                st.error("Failed to update workout")
-
-                        if cancel_btn:
-                            st.session_state[edit_key] = False
-                            st.rerun()
+                if st.session_state.setdefault(f"edit_{workout_id}", False):
+                    render_edit_form(workout)
                 else:
-                    # View mode
-                    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-
-                    with col1:
-                        # Display workout info
-                        status_icon = "✅" if workout.get("completed") else "⏳"
-                        st.markdown(f"### {status_icon} Workout #{workout_id} - {format_name}")
-                        st.markdown(f"**Date:** {date_str}")
-                        st.markdown(f"**Equipment:** {', '.join(workout.get('equipment', []))}")
-                        if workout.get("location"):
-                            st.markdown(f"**Location:** {workout['location']}")
-                        st.markdown(f"**Description:** {description}")
-
-                        # Show exercises if available
-                        exercises = workout_plan.get("exercises", [])
-                        if exercises:
-                            st.markdown("**Exercises:**")
-                            for ex in exercises:
-                                ex_name = ex.get("name", "Unknown")
-                                ex_reps = ex.get("reps", 0)
-                                st.markdown(f"- {ex_name}: {ex_reps} reps")
-
-                    with col2:
-                        st.markdown("")  # Spacing
-                        if workout.get("completed"):
-                            st.success("✅ Completed")
-                        else:
-                            st.info("⏳ Pending")
-
-                    with col3:
-                        st.markdown("")  # Spacing
-                        if not workout.get("completed"):
-                            if st.button(
-                                "✅ Complete",
-                                key=f"complete_{workout_id}",
-                                use_container_width=True,
-                            ):
-                                if update_workout_completion(workout_id, completed=True):
-                                    st.success("Workout marked as completed! 🎉")
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to update workout status")
-                        else:
-                            if st.button(
-                                "↩️ Incomplete",
-                                key=f"incomplete_{workout_id}",
-                                use_container_width=True,
-                            ):
-                                if update_workout_completion(workout_id, completed=False):
-                                    st.info("Workout marked as incomplete")
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to update workout status")
-
-                    with col4:
-                        st.markdown("")  # Spacing
-                        col4a, col4b = st.columns(2)
-                        with col4a:
-                            if st.button(
-                                "✏️",
-                                key=f"edit_btn_{workout_id}",
-                                help="Edit workout",
-                                use_container_width=True,
-                            ):
-                                st.session_state[edit_key] = True
-                                st.rerun()
-                        with col4b:
-                            if st.button(
-                                "🗑️",
-                                key=f"delete_btn_{workout_id}",
-                                help="Delete workout",
-                                use_container_width=True,
-                            ):
-                                if delete_workout(workout_id):
-                                    st.success("Workout deleted! 🗑️")
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to delete workout")
+                    render_workout_card(workout)
 
                 st.divider()
 
-except Exception as e:
-    st.error(f"Error loading workout history: {str(e)}")
+        if len(workouts) < total_workouts:
+            st.button("⬇️ Load more", on_click=load_more, use_container_width=True)
+
+    except Exception as e:
+        st.error(f"Error loading workout history: {str(e)}")
+
+
+# Page configuration
+page_config(page_title="Workout History - ROAMFIT", page_icon="📋")
+
+# Initialize database tables
+ensure_db_ready()
+
+st.title("📋 Workout History")
+st.markdown("View and manage your saved workouts")
+
+render_history()
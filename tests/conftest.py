@@ -1,6 +1,6 @@
 """Shared fixtures for ROAMFIT tests."""
 import os
-import tempfile
+import sqlite3
 from pathlib import Path
 
 import pytest
@@ -8,25 +8,51 @@ import pytest
 from database import create_tables, get_db_connection
 
 
-@pytest.fixture
+# Mock OpenAI response types, defined once at import instead of on every fixture call
+class MockUsage:
+    def __init__(self):
+        self.prompt_tokens = 10
+        self.completion_tokens = 20
+        self.total_tokens = 30
+
+
+class MockMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class MockChoice:
+    def __init__(self, content):
+        self.message = MockMessage(content)
+
+
+class MockResponse:
+    def __init__(self, content="Test response"):
+        self.choices = [MockChoice(content)]
+        self.usage = MockUsage()
+
+
+@pytest.fixture(scope="session")
 def temp_db():
-    """Create a temporary SQLite database for testing."""
-    # Create temporary database file
-    fd, db_path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
+    """Create one in-memory SQLite database shared by the whole test session."""
+    # One database per pytest-xdist worker so parallel runs never share tables
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    db_path = f"file:roamfit_{worker}?mode=memory&cache=shared"
 
     # Set environment variable for database path
     original_db_path = os.environ.get("DATABASE_PATH")
     os.environ["DATABASE_PATH"] = db_path
 
-    # Create tables
+    # A shared-cache memory database lives only while a connection is open
+    keeper = sqlite3.connect(db_path, uri=True)
+
+    # Create tables once per session
     create_tables()
 
     yield db_path
 
     # Cleanup
-    if os.path.exists(db_path):
-        os.unlink(db_path)
+    keeper.close()
 
     # Restore original database path
     if original_db_path:
@@ -35,27 +61,23 @@ def temp_db():
         del os.environ["DATABASE_PATH"]
 
 
+@pytest.fixture(autouse=True)
+def _clean_tables(temp_db):
+    """Empty every table after each test so tests stay isolated on the shared database."""
+    yield
+    with get_db_connection() as conn:
+        conn.executescript(
+            """
+            DELETE FROM workouts;
+            DELETE FROM equipment_detections;
+            DELETE FROM user_preferences;
+            DELETE FROM llm_logs;
+            DELETE FROM sqlite_sequence;
+        """
+        )
+
+
 @pytest.fixture
 def mock_openai_response():
     """Create a mock OpenAI API response."""
-
-    class MockUsage:
-        def __init__(self):
-            self.prompt_tokens = 10
-            self.completion_tokens = 20
-            self.total_tokens = 30
-
-    class MockMessage:
-        def __init__(self, content):
-            self.content = content
-
-    class MockChoice:
-        def __init__(self, content):
-            self.message = MockMessage(content)
-
-    class MockResponse:
-        def __init__(self, content="Test response"):
-            self.choices = [MockChoice(content)]
-            self.usage = MockUsage()
-
     return MockResponse
@@ -11,9 +11,12 @@ from database import (
     get_llm_stats,
     get_workout_by_id,
     get_workout_history,
+    get_workout_signature,
     save_equipment_detection,
     save_llm_log,
+    save_llm_logs_bulk,
     save_workout,
+    save_workouts_bulk,
     update_workout,
     update_workout_completion,
 )
@@ -50,11 +53,14 @@ class TestWorkoutOperations:
 
     def test_get_workout_history(self, temp_db):
         """Test retrieving workout history."""
-        # Save multiple workouts
-        for i in range(3):
-            save_workout(
-                equipment=[f"equipment_{i}"], workout_plan={"format": "AMRAP", "exercises": []}
-            )
+        # Save multiple workouts in one transaction
+        saved = save_workouts_bulk(
+            [
+                {"equipment": [f"equipment_{i}"], "workout_plan": {"format": "AMRAP", "exercises": []}}
+                for i in range(3)
+            ]
+        )
+        assert saved == 3
 
         # Get history
         history = get_workout_history(limit=5)
@@ -63,6 +69,29 @@ class TestWorkoutOperations:
         assert all("id" in w for w in history)
         assert all("equipment" in w for w in history)
 
+    def test_get_workout_history_offset(self, temp_db):
+        """Test paging through workout history with limit/offset."""
+        ids = [
+            save_workout(equipment=[], workout_plan={"format": "AMRAP", "exercises": []})
+            for _ in range(5)
+        ]
+
+        first_page = get_workout_history(limit=2)
+        last_page = get_workout_history(limit=2, offset=4)
+
+        assert [w["id"] for w in first_page] == [ids[4], ids[3]]
+        assert [w["id"] for w in last_page] == [ids[0]]
+
+    def test_get_workout_signature(self, temp_db):
+        """Test that the signature tracks the workout count and latest date."""
+        assert get_workout_signature() == (0, None)
+
+        save_workout(equipment=[], workout_plan={"format": "AMRAP", "exercises": []})
+
+        count, last_date = get_workout_signature()
+        assert count == 1
+        assert last_date is not None
+
     def test_get_workout_by_id(self, temp_db):
         """Test retrieving workout by ID."""
         # Save a workout
@@ -176,6 +205,20 @@ class TestLLMLogOperations:
 
         assert log_id > 0
 
+    def test_save_llm_logs_bulk(self, temp_db):
+        """Test saving several LLM logs in one call."""
+        saved = save_llm_logs_bulk(
+            [
+                {"agent_name": "agent1", "model": "gpt-4", "status": "SUCCESS", "tokens_in": 5},
+                {"agent_name": "agent2", "model": "gpt-4", "status": "FAILED", "error_message": "x"},
+            ]
+        )
+
+        assert saved == 2
+        stats = get_llm_stats()
+        assert stats["total_calls"] == 2
+        assert stats["successful_calls"] == 1
+
     def test_get_llm_stats(self, temp_db):
         """Test getting LLM statistics."""
         # Save some logs
@@ -188,5 +231,20 @@ class TestLLMLogOperations:
         assert stats["total_calls"] == 2
         assert stats["successful_calls"] == 2
         assert stats["total_tokens"] == 70  # 10+20+15+25
+        assert stats["estimated_cost"] == 0.0018  # gpt-4: 0.0015 + gpt-4o: 0.0002875
         assert len(stats["by_agent"]) == 2
         assert len(stats["by_model"]) == 2
+
+    def test_get_llm_stats_reports_cache_hits_separately(self, temp_db):
+        """Test that cache hits don't count as API calls or skew response times."""
+        save_llm_log("agent1", "gpt-4", "SUCCESS", 10, 20, 100)
+        save_llm_log("agent1", "gpt-4", "CACHE_HIT", 0, 0, 0)
+
+        stats = get_llm_stats()
+
+        assert stats["total_calls"] == 1
+        assert stats["successful_calls"] == 1
+        assert stats["cache_hits"] == 1
+        assert stats["by_agent"][0]["call_count"] == 1
+        assert stats["by_agent"][0]["avg_time_ms"] == 100
+        assert stats["by_model"][0]["call_count"] == 1
@@ -0,0 +1,25 @@
+"""Tests for ROAMFIT exceptions."""
+import pickle
+
+from utils.exceptions import AgentError, DatabaseError, ValidationError
+
+
+class TestExceptionPickling:
+    """Exceptions must survive pickling, e.g. when raised in a worker process."""
+
+    def test_subclasses_round_trip(self):
+        """Each subclass keeps its type, message, status code and details."""
+        errors = [
+            ValidationError("bad input", details={"field": "equipment"}),
+            AgentError("agent failed", agent_name="workout_generator"),
+            DatabaseError("db failed", operation="save_workout"),
+        ]
+
+        for error in errors:
+            restored = pickle.loads(pickle.dumps(error))
+
+            assert type(restored) is type(error)
+            assert restored.message == error.message
+            assert restored.status_code == error.status_code
+            assert restored.details == error.details
+            assert restored.args == error.args
@@ -1,16 +1,43 @@
 """Tests for LLM utility functions."""
-from unittest.mock import MagicMock, Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import httpx
+import openai
 import pytest
 
-from utils.llm import call_llm, call_vision
+from database import get_llm_stats
+from utils.llm import (
+    _MAX_ATTEMPTS,
+    _in_flight,
+    call_llm,
+    call_llm_many,
+    call_vision,
+    clear_prompt_cache,
+    flush_llm_logs,
+    reset_client,
+)
+
+# Shared error instances for the failing-API tests
+_API_ERR = RuntimeError("API Error")
+_VISION_ERR = RuntimeError("Vision API Error")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_client():
+    """Config, clients and responses are cached; reset so each test sees its own mocks."""
+    reset_client()
+    clear_prompt_cache()
+    yield
+    reset_client()
+    clear_prompt_cache()
 
 
 class TestCallLLM:
     """Tests for call_llm function."""
 
     @patch("utils.llm.OpenAI")
-    @patch("utils.llm.save_llm_log")
+    @patch("utils.llm._queue_db_log")
     @patch("utils.llm.get_config")
     def test_call_llm_success(self, mock_get_config, mock_save_log, mock_openai_class):
         """Test successful LLM call."""
@@ -39,7 +66,7 @@ class TestCallLLM:
         mock_save_log.assert_called_once()
 
     @patch("utils.llm.OpenAI")
-    @patch("utils.llm.save_llm_log")
+    @patch("utils.llm._queue_db_log")
     @patch("utils.llm.get_config")
     def test_call_llm_error(self, mock_get_config, mock_save_log, mock_openai_class):
         """Test LLM call with error."""
@@ -49,10 +76,10 @@ class TestCallLLM:
         # Setup mock to raise exception
         mock_client = MagicMock()
         mock_openai_class.return_value = mock_client
-        mock_client.chat.completions.create.side_effect = Exception("API Error")
+        mock_client.chat.completions.create.side_effect = _API_ERR
 
         # Test
-        with pytest.raises(Exception):
+        with pytest.raises(RuntimeError, match="API Error"):
             call_llm("test prompt", agent_name="test_agent")
 
         # Verify error was logged
@@ -69,12 +96,11 @@ class TestCallLLM:
 class TestCallVision:
     """Tests for call_vision function."""
 
-    @patch("builtins.open", create=True)
     @patch("utils.llm.OpenAI")
-    @patch("utils.llm.save_llm_log")
+    @patch("utils.llm._queue_db_log")
     @patch("utils.llm.get_config")
     def test_call_vision_success(
-        self, mock_get_config, mock_save_log, mock_openai_class, mock_open
+        self, mock_get_config, mock_save_log, mock_openai_class, tmp_path
     ):
         """Test successful vision API call."""
         # Setup config mock
@@ -93,24 +119,24 @@ class TestCallVision:
 
         mock_client.chat.completions.create.return_value = mock_response
 
-        # Mock file read
-        mock_file = MagicMock()
-        mock_file.read.return_value = b"fake image data"
-        mock_open.return_value.__enter__.return_value = mock_file
+        # A small PNG file on disk
+        image_path = tmp_path / "test_image.png"
+        image_path.write_bytes(b"\x89PNG\r\n\x1a\nfake image data")
 
         # Test
-        result = call_vision("test_image.jpg", "detect equipment", agent_name="test_agent")
+        result = call_vision(str(image_path), "detect equipment", agent_name="test_agent")
 
         # Assertions
         assert "dumbbells" in result.lower() or "bench" in result.lower()
         mock_client.chat.completions.create.assert_called_once()
         mock_save_log.assert_called_once()
+        content = mock_client.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+        assert content[1]["image_url"]["url"].startswith("data:image/png;base64,")
 
-    @patch("builtins.open", create=True)
     @patch("utils.llm.OpenAI")
-    @patch("utils.llm.save_llm_log")
+    @patch("utils.llm._queue_db_log")
     @patch("utils.llm.get_config")
-    def test_call_vision_error(self, mock_get_config, mock_save_log, mock_openai_class, mock_open):
+    def test_call_vision_error(self, mock_get_config, mock_save_log, mock_openai_class, tmp_path):
         """Test vision call with error."""
         # Setup config mock
         mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
@@ -118,16 +144,14 @@ class TestCallVision:
         # Setup mock to raise exception
         mock_client = MagicMock()
         mock_openai_class.return_value = mock_client
-        mock_client.chat.completions.create.side_effect = Exception("Vision API Error")
+        mock_client.chat.completions.create.side_effect = _VISION_ERR
 
-        # Mock file read
-        mock_file = MagicMock()
-        mock_file.read.return_value = b"fake image data"
-        mock_open.return_value.__enter__.return_value = mock_file
+        image_path = tmp_path / "test_image.jpg"
+        image_path.write_bytes(b"\xff\xd8fake image data")
 
         # Test
-        with pytest.raises(Exception):
-            call_vision("test_image.jpg", "detect equipment", agent_name="test_agent")
+        with pytest.raises(RuntimeError, match="Vision API Error"):
+            call_vision(str(image_path), "detect equipment", agent_name="test_agent")
 
         # Verify error was logged
         assert mock_save_log.called
@@ -138,3 +162,297 @@ class TestCallVision:
         mock_get_config.return_value = {"OPENAI_API_KEY": ""}
         with pytest.raises(ValueError, match="OPENAI_API_KEY not found"):
             call_vision("test_image.jpg", "detect equipment")
+
+
+class TestClientReuse:
+    """Tests for the shared OpenAI client."""
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_client_built_once(self, mock_get_config, mock_save_log, mock_openai_class):
+        """Repeated calls with the same key reuse one client."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+
+        call_llm("first prompt")
+        call_llm("second prompt")
+
+        mock_openai_class.assert_called_once()
+
+
+class TestPromptCache:
+    """Tests for the exact-match prompt cache."""
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_repeat_prompt_served_from_cache(
+        self, mock_get_config, mock_save_log, mock_openai_class
+    ):
+        """The same prompt and model hit the API once; the repeat is logged as a cache hit."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        mock_client = mock_openai_class.return_value
+        mock_client.chat.completions.create.return_value.choices[0].message.content = "Cached"
+
+        assert call_llm("same prompt", cache=True) == "Cached"
+        assert call_llm("same prompt", cache=True) == "Cached"
+        call_llm("same prompt", model="gpt-4o", cache=True)
+
+        assert mock_client.chat.completions.create.call_count == 2
+        statuses = [c.kwargs["status"] for c in mock_save_log.call_args_list]
+        assert statuses == ["SUCCESS", "CACHE_HIT", "SUCCESS"]
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_cache_is_opt_in(self, mock_get_config, mock_save_log, mock_openai_class):
+        """Without cache=True every call reaches the API and nothing is stored."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        create = mock_openai_class.return_value.chat.completions.create
+
+        call_llm("same prompt")
+        call_llm("same prompt")
+        call_llm("same prompt", cache=True)
+
+        assert create.call_count == 3
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_bytes_prompt_shares_cache(self, mock_get_config, mock_save_log, mock_openai_class):
+        """A UTF-8 bytes prompt is sent as text and hits the entry cached for the same str."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        create = mock_openai_class.return_value.chat.completions.create
+        create.return_value.choices[0].message.content = "Cached"
+
+        assert call_llm("plan for café".encode(), cache=True) == "Cached"
+        assert call_llm("plan for café", cache=True) == "Cached"
+
+        create.assert_called_once()
+        assert create.call_args.kwargs["messages"][0]["content"] == "plan for café"
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_invalid_utf8_prompt_logs_full_error(
+        self, mock_get_config, mock_save_log, mock_openai_class
+    ):
+        """Undecodable bytes fail before the API call and log the full decode error."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+
+        with pytest.raises(UnicodeDecodeError):
+            call_llm(b"\xff\xfe")
+
+        mock_openai_class.return_value.chat.completions.create.assert_not_called()
+        error_message = mock_save_log.call_args.kwargs["error_message"]
+        assert error_message != "utf-8"
+        assert "can't decode byte 0xff" in error_message
+
+
+class TestCallLLMMany:
+    """Tests for concurrent call_llm_many."""
+
+    @patch("utils.llm.AsyncOpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_results_in_prompt_order(self, mock_get_config, mock_save_log, mock_async_class):
+        """Each prompt gets its own result; a failing prompt returns its exception."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+
+        async def create(model, messages):
+            prompt = messages[0]["content"]
+            if prompt == "bad":
+                raise _API_ERR
+            response = MagicMock()
+            response.choices[0].message.content = f"echo {prompt}"
+            return response
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=create)
+        mock_async_class.return_value.__aenter__.return_value = mock_client
+
+        results = asyncio.run(call_llm_many(["a", "bad", "b"], concurrency=2))
+
+        assert results == ["echo a", _API_ERR, "echo b"]
+        mock_async_class.assert_called_once()
+
+    @patch("utils.llm._retry_delay", return_value=0)
+    @patch("utils.llm.AsyncOpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_retry_checks_out_another_endpoint(
+        self, mock_get_config, mock_save_log, mock_async_class, mock_delay
+    ):
+        """A transient async failure is retried on the next endpoint, not the same client."""
+        mock_get_config.return_value = {
+            "OPENAI_API_KEY": "",
+            "OPENAI_POOL": '[{"api_key": "key-1"}, {"api_key": "key-2"}]',
+        }
+        used = []
+
+        def build_client(api_key, **kwargs):
+            async def create(model, messages):
+                used.append(api_key)
+                if len(used) == 1:
+                    raise openai.APIConnectionError(request=MagicMock())
+                response = MagicMock()
+                response.choices[0].message.content = "Recovered"
+                return response
+
+            client = MagicMock()
+            client.chat.completions.create = AsyncMock(side_effect=create)
+            wrapper = MagicMock()
+            wrapper.__aenter__.return_value = client
+            return wrapper
+
+        mock_async_class.side_effect = build_client
+
+        assert asyncio.run(call_llm_many(["a"])) == ["Recovered"]
+        assert len(set(used)) == 2
+
+    def test_rejects_non_positive_concurrency(self):
+        """concurrency=0 would block every prompt on the semaphore forever."""
+        with pytest.raises(ValueError, match="concurrency"):
+            asyncio.run(call_llm_many(["a"], concurrency=0))
+
+
+class TestBackgroundLogging:
+    """Tests for the queued llm_logs writer."""
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm.get_config")
+    def test_logs_written_after_flush(self, mock_get_config, mock_openai_class, temp_db):
+        """Calls queue their log rows; flush_llm_logs waits until they are in the database."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        mock_client = mock_openai_class.return_value
+        mock_client.chat.completions.create.return_value.usage.prompt_tokens = 10
+        mock_client.chat.completions.create.return_value.usage.completion_tokens = 20
+
+        call_llm("first prompt", agent_name="test_agent", cache=True)
+        call_llm("first prompt", agent_name="test_agent", cache=True)
+        flush_llm_logs()
+
+        stats = get_llm_stats()
+        assert stats["total_calls"] == 1
+        assert stats["successful_calls"] == 1
+        assert stats["cache_hits"] == 1
+        assert stats["total_tokens"] == 30
+
+
+class TestEndpointPool:
+    """Tests for spreading calls across OPENAI_POOL endpoints."""
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_calls_rotate_across_pool(self, mock_get_config, mock_save_log, mock_openai_class):
+        """Sequential calls share the pool evenly and build one client per endpoint."""
+        mock_get_config.return_value = {
+            "OPENAI_API_KEY": "",
+            "OPENAI_POOL": '[{"api_key": "key-1"}, {"api_key": "key-2", "base_url": "http://b"}]',
+        }
+
+        for i in range(4):
+            call_llm(f"prompt {i}")
+
+        keys = sorted(c.kwargs["api_key"] for c in mock_openai_class.call_args_list)
+        assert keys == ["key-1", "key-2"]
+        assert mock_openai_class.return_value.chat.completions.create.call_count == 4
+
+    @pytest.mark.parametrize(
+        "pool_json",
+        [
+            "[]",
+            '[{"base_url": "http://b"}]',
+            '[{"api_key": ""}]',
+            '["key-1"]',
+            "{",
+            '{"api_key": "k"}',
+        ],
+    )
+    @patch("utils.llm.get_config")
+    def test_invalid_pool_rejected(self, mock_get_config, pool_json):
+        """An empty or malformed OPENAI_POOL fails with a clear ValueError."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "", "OPENAI_POOL": pool_json}
+
+        with pytest.raises(ValueError, match="OPENAI_POOL"):
+            call_llm("test prompt")
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_reset_during_call_keeps_counts(
+        self, mock_get_config, mock_save_log, mock_openai_class
+    ):
+        """reset_client() mid-call doesn't leave the in-flight counter negative."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+
+        def reset_then_respond(**kwargs):
+            reset_client()
+            return MagicMock()
+
+        create = mock_openai_class.return_value.chat.completions.create
+        create.side_effect = reset_then_respond
+
+        call_llm("test prompt")
+        call_llm("test prompt")
+
+        assert not _in_flight
+
+
+class TestRetry:
+    """Tests for retrying transient API errors."""
+
+    @patch("utils.llm._retry_delay", return_value=0)
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_transient_error_retried(
+        self, mock_get_config, mock_save_log, mock_openai_class, mock_delay
+    ):
+        """A connection error is retried and only the final success is logged."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        create = mock_openai_class.return_value.chat.completions.create
+        response = MagicMock()
+        response.choices[0].message.content = "Recovered"
+        create.side_effect = [openai.APIConnectionError(request=MagicMock()), response]
+
+        assert call_llm("test prompt") == "Recovered"
+        assert create.call_count == 2
+        mock_save_log.assert_called_once()
+        assert mock_save_log.call_args.kwargs["status"] == "SUCCESS"
+
+    @patch("utils.llm._retry_delay", return_value=0)
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_sdk_does_not_retry_on_its_own(self, mock_get_config, mock_save_log, mock_delay):
+        """A retryable status sends exactly one request per attempt of our retry loop."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        requests = []
+
+        def unavailable(request):
+            requests.append(request)
+            return httpx.Response(503, json={"error": {"message": "overloaded"}})
+
+        class MockedClient(httpx.Client):
+            def __init__(self, **kwargs):
+                super().__init__(transport=httpx.MockTransport(unavailable), **kwargs)
+
+        with patch("utils.llm.httpx.Client", MockedClient):
+            with pytest.raises(openai.InternalServerError):
+                call_llm("test prompt")
+
+        assert len(requests) == _MAX_ATTEMPTS
+
+    @patch("utils.llm.OpenAI")
+    @patch("utils.llm._queue_db_log")
+    @patch("utils.llm.get_config")
+    def test_other_errors_not_retried(self, mock_get_config, mock_save_log, mock_openai_class):
+        """Non-transient errors fail on the first attempt."""
+        mock_get_config.return_value = {"OPENAI_API_KEY": "test-key"}
+        create = mock_openai_class.return_value.chat.completions.create
+        create.side_effect = _API_ERR
+
+        with pytest.raises(RuntimeError, match="API Error"):
+            call_llm("test prompt")
+        assert create.call_count == 1
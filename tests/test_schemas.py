@@ -0,0 +1,152 @@
+"""Tests for data model serialization."""
+from dataclasses import FrozenInstanceError, fields
+from itertools import islice
+from typing import Any, Dict, List
+
+import pytest
+
+from models.schemas import (
+    EquipmentDetection,
+    EquipmentDetectionResponse,
+    Exercise,
+    Location,
+    WorkoutHistory,
+    WorkoutPlan,
+    WorkoutStats,
+)
+
+
+class TestWorkoutPlan:
+    """Tests for WorkoutPlan serialization."""
+
+    def test_to_dict_omits_unset_optional_fields(self):
+        """Test that optional plan and exercise fields are only emitted when set."""
+        plan = WorkoutPlan(
+            format="EMOM",
+            exercises=[
+                Exercise(name="Burpees", reps=10, instructions=""),
+                Exercise(name="Thrusters", reps=8, instructions="", sets=3, rest_seconds=60),
+            ],
+            duration_minutes=12,
+            focus="full_body",
+            warmup="Jog 2 min",
+        )
+
+        result = plan.to_dict()
+
+        assert result["exercises"][0] == {"name": "Burpees", "reps": 10, "instructions": ""}
+        assert result["exercises"][1]["sets"] == 3
+        assert result["exercises"][1]["rest_seconds"] == 60
+        assert result["warmup"] == "Jog 2 min"
+        assert "cooldown" not in result
+        assert "workout_description" not in result
+
+    def test_round_trip(self):
+        """Test that from_dict(to_dict()) preserves the plan."""
+        plan = WorkoutPlan(
+            format="AMRAP",
+            exercises=[Exercise(name="Push-ups", reps=15, instructions="", sets=2)],
+            duration_minutes=15,
+            focus="upper_body",
+            workout_description="AMRAP 15: 15 Push-ups",
+        )
+
+        assert WorkoutPlan.from_dict(plan.to_dict()) == plan
+
+    def test_from_dict_defaults(self):
+        """Test defaults for missing keys."""
+        plan = WorkoutPlan.from_dict({})
+
+        assert plan.format == "AMRAP"
+        assert plan.exercises == []
+        assert plan.duration_minutes == 20
+        assert plan.focus == "full_body"
+
+    def test_iter_exercises_is_lazy(self):
+        """Test that only the consumed exercises are built."""
+        raw: List[Dict[str, Any]] = [{"name": "Burpees", "reps": 10, "instructions": ""}, {"bad": "row"}]
+
+        first = list(islice(WorkoutPlan.iter_exercises(raw), 1))
+
+        assert first == [Exercise(name="Burpees", reps=10, instructions="")]
+
+    def test_from_dict_coerces_int_fields(self):
+        """Test that numeric strings from LLM output are stored as ints."""
+        plan = WorkoutPlan.from_dict(
+            {"exercises": [{"name": "Row", "reps": "12", "instructions": "", "sets": "3"}]}
+        )
+
+        assert plan.exercises[0] == Exercise(name="Row", reps=12, instructions="", sets=3)
+
+    def test_from_dict_interns_enum_fields(self):
+        """Test that format/focus from separate payloads share one string object."""
+        first = WorkoutPlan.from_dict({"format": "".join(["For ", "Time"]), "focus": "cardio"})
+        second = WorkoutPlan.from_dict({"format": "".join(["For", " Time"]), "focus": "cardio"})
+
+        assert first.format is second.format
+        assert first.focus is second.focus
+
+
+class TestOtherModels:
+    """Tests for the remaining model serializers."""
+
+    def test_workout_history_to_dict(self):
+        """Test WorkoutHistory serialization."""
+        history = WorkoutHistory(summary="Two workouts", total_workouts=2)
+
+        assert history.to_dict() == {
+            "summary": "Two workouts",
+            "last_workout_date": None,
+            "total_workouts": 2,
+        }
+
+    def test_value_objects_are_frozen(self):
+        """Test that value objects are immutable and to_dict returns an independent dict."""
+        stats = WorkoutStats(
+            total_workouts=4,
+            completed_workouts=3,
+            recent_workouts_30_days=2,
+            workouts_per_week=1.5,
+            completion_rate=75.0,
+        )
+
+        assert stats.to_dict()["completion_rate"] == 75.0
+        assert [f.name for f in fields(stats)] == list(stats.to_dict())
+
+        # Each call builds a fresh dict, so mutating one result doesn't change later ones
+        stats.to_dict()["completion_rate"] = 0.0
+        assert stats.to_dict()["completion_rate"] == 75.0
+        assert stats == WorkoutStats(4, 3, 2, 1.5, 75.0)
+        with pytest.raises(FrozenInstanceError):
+            stats.total_workouts = 5  # type: ignore[misc]
+
+    def test_location_derives_distance_m(self):
+        """Test that distance_m is computed from distance_km and kept on the wire."""
+        location = Location(
+            name="Gym", address="1 Main St", latitude=1.0, longitude=2.0, distance_km=1.23456
+        )
+
+        assert location.distance_m == 1235
+        assert location.to_dict()["distance_km"] == 1.23
+        assert location.to_dict()["distance_m"] == 1235
+
+    def test_equipment_detection_to_dict(self):
+        """Test that EquipmentDetection skips empty optional fields."""
+        detection = EquipmentDetection(equipment=["dumbbells"], detection_id=7)
+
+        assert detection.to_dict() == {"equipment": ["dumbbells"], "detection_id": 7}
+
+    def test_agent_response_to_dict(self):
+        """Test that response subclasses include base and subclass fields."""
+        response = EquipmentDetectionResponse(
+            success=True, message="ok", equipment=["bench"], location="Home"
+        )
+
+        assert response.to_dict() == {
+            "success": True,
+            "message": "ok",
+            "data": None,
+            "equipment": ["bench"],
+            "image_path": None,
+            "location": "Home",
+        }
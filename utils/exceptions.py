@@ -1,9 +1,10 @@
 """Centralized exception handling for ROAMFIT."""
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Type
 
 from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+
+from utils.responses import OrjsonResponse
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,19 @@ class ROAMFITException(Exception):
         self.details = details or {}
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Subclass __init__ signatures differ, so rebuild from the stored fields instead
+        return _restore_exception, (type(self), self.message, self.status_code, self.details)
+
+
+def _restore_exception(
+    cls: Type[ROAMFITException], message: str, status_code: int, details: Dict[str, Any]
+) -> ROAMFITException:
+    """Recreate a pickled ROAMFITException without calling the subclass __init__."""
+    exc = cls.__new__(cls)
+    ROAMFITException.__init__(exc, message, status_code=status_code, details=details)
+    return exc
+
 
 class ValidationError(ROAMFITException):
     """Input validation error."""
@@ -45,30 +59,34 @@ class DatabaseError(ROAMFITException):
         super().__init__(message, status_code=500, details=details)
 
 
-def handle_exception(e: Exception, context: Optional[str] = None) -> JSONResponse:
+def handle_exception(e: Exception, context: Optional[str] = None) -> OrjsonResponse:
     """
     Centralized exception handler.
     Translates exceptions into standardized JSON error responses.
     """
     logger.error(
-        f"Exception in {context or 'unknown context'}: {type(e).__name__}: {str(e)}", exc_info=True
+        "Exception in %s: %s: %s",
+        context or "unknown context",
+        type(e).__name__,
+        e,
+        exc_info=True,
     )
 
     if isinstance(e, ROAMFITException):
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=e.status_code,
             content={
                 "error": {"type": type(e).__name__, "message": e.message, "details": e.details}
             },
         )
     elif isinstance(e, HTTPException):
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=e.status_code,
             content={"error": {"type": "HTTPException", "message": e.detail, "details": {}}},
         )
     else:
         # Generic exception
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=500,
             content={
                 "error": {
@@ -86,12 +104,12 @@ def safe_agent_call(agent_func, query: str, agent_name: str):
     Returns (success: bool, response: str, error: Optional[Exception])
     """
     try:
-        logger.info(f"Calling agent: {agent_name} with query: {query[:100]}...")
+        logger.info("Calling agent: %s with query: %.100s...", agent_name, query)
         response = agent_func(query)
-        logger.info(f"Agent {agent_name} completed successfully")
-        return True, str(response), None
+        logger.info("Agent %s completed successfully", agent_name)
+        return True, response if isinstance(response, str) else str(response), None
     except Exception as e:
-        logger.error(f"Agent {agent_name} failed: {str(e)}", exc_info=True)
+        logger.error("Agent %s failed: %s", agent_name, e, exc_info=True)
         return (
             False,
             "",
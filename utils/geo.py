@@ -0,0 +1,24 @@
+"""Geographic distance helpers for ROAMFIT."""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances (km) from one point to arrays of points, in one vectorized pass."""
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    lats_r, lons_r = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lats_r - lat_r) / 2) ** 2
+        + np.cos(lat_r) * np.cos(lats_r) * np.sin((lons_r - lon_r) / 2) ** 2
+    )
+    return np.asarray(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a)), dtype=float)
+
+
+def nearest_within_radius(distances: np.ndarray, radius_km: float, limit: int) -> np.ndarray:
+    """Indices of the `limit` closest distances within radius_km, nearest first."""
+    within = np.flatnonzero(distances <= radius_km)
+    if within.size > limit:
+        # O(n) partial selection instead of sorting every candidate
+        within = within[np.argpartition(distances[within], limit - 1)[:limit]]
+    return within[np.argsort(distances[within], kind="stable")]
@@ -1,13 +1,33 @@
 """LLM utility functions for ROAMFIT."""
+import asyncio
+import atexit
 import base64
+import hashlib
+import itertools
 import logging
+import logging.handlers
+import mmap
+import queue
+import random
+import threading
 import time
+from collections import Counter
+from contextlib import AsyncExitStack, contextmanager
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from openai import OpenAI
+import httpx
+import openai
+import orjson
+from cachetools import TTLCache
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletionMessageParam
 
 from config import get_config
-from database import save_llm_log
+from database import save_llm_logs_bulk
+from utils.validation import detect_image_mime
 
 # Setup logging
 log_dir = Path("logs")
@@ -37,188 +57,502 @@ class LLMLogFormatter(logging.Formatter):
 handler = logging.FileHandler(log_file)
 formatter = LLMLogFormatter()
 handler.setFormatter(formatter)
-logger.addHandler(handler)
 
+# File writes happen on a listener thread; callers only enqueue the record.
+# Unbounded: QueueHandler uses put_nowait, which would turn a full queue into logging errors.
+_log_records: queue.Queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(_log_records))
+_log_listener = logging.handlers.QueueListener(_log_records, handler)
+_log_listener.start()
+
+# llm_logs rows are written in batches by a background thread, off the request path
+_DB_LOG_BATCH_SIZE = 64
+_DB_LOG_WAIT_S = 0.05
+_db_log_queue: queue.Queue = queue.Queue(maxsize=10_000)
+
+
+def _queue_db_log(
+    agent_name: str,
+    model: str,
+    status: str,
+    tokens_in: int = 0,
+    tokens_out: int = 0,
+    time_ms: int = 0,
+    error_message: Optional[str] = None,
+) -> None:
+    """Queue an llm_logs row (same arguments as save_llm_log) for the background writer."""
+    row = {
+        "agent_name": agent_name,
+        "model": model,
+        "status": status,
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
+        "time_ms": time_ms,
+        "error_message": error_message,
+        "created_at": datetime.now().isoformat(),
+    }
+    try:
+        _db_log_queue.put_nowait(row)
+    except queue.Full:
+        # Don't block or fail the LLM call if the writer falls behind
+        logger.warning("LLM log queue full, dropping database log row")
+
+
+def _db_log_worker() -> None:
+    """Write queued llm_logs rows in batches of up to _DB_LOG_BATCH_SIZE."""
+    while True:
+        batch = [_db_log_queue.get()]
+        deadline = time.monotonic() + _DB_LOG_WAIT_S
+        while len(batch) < _DB_LOG_BATCH_SIZE:
+            try:
+                batch.append(_db_log_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        try:
+            save_llm_logs_bulk(batch)
+        except Exception as db_error:
+            # Don't fail if database logging fails
+            logger.warning("Failed to log to database: %s", db_error)
+        finally:
+            for _ in batch:
+                _db_log_queue.task_done()
+
+
+def flush_llm_logs() -> None:
+    """Block until every queued llm_logs row has been written to the database."""
+    _db_log_queue.join()
+
+
+threading.Thread(target=_db_log_worker, name="llm-log-writer", daemon=True).start()
+# atexit runs in reverse order: drain the DB rows first, then the file listener
+atexit.register(_log_listener.stop)
+atexit.register(flush_llm_logs)
+
+
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+
+# An (api_key, base_url) pair; base_url None means the default OpenAI endpoint
+Endpoint = Tuple[str, Optional[str]]
+
+
+@lru_cache(maxsize=16)
+def _get_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+    """
+    Shared OpenAI client per endpoint, so calls reuse pooled keep-alive connections.
+
+    SDK retries are off: _create_completion retries itself, across endpoints.
+    """
+    http_client = httpx.Client(limits=_POOL_LIMITS, timeout=_TIMEOUT)
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+
+def _new_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Async OpenAI client with the same pool settings as the sync one.
+
+    Not cached: httpx async pools are bound to the event loop that opened them.
+    """
+    http_client = httpx.AsyncClient(limits=_POOL_LIMITS, timeout=_TIMEOUT)
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+
+
+async def _open_async_clients(
+    stack: AsyncExitStack, endpoints: Tuple[Endpoint, ...]
+) -> Dict[Endpoint, AsyncOpenAI]:
+    """Open one async client per endpoint, closed when the stack exits."""
+    return {
+        endpoint: await stack.enter_async_context(_new_async_client(*endpoint))
+        for endpoint in endpoints
+    }
+
+
+@lru_cache(maxsize=1)
+def _cfg() -> Dict[str, str]:
+    """Configuration, read once per process instead of on every call."""
+    return get_config()
+
+
+def reset_client() -> None:
+    """Re-read configuration and drop cached clients (e.g. after rotating the API key)."""
+    _cfg.cache_clear()
+    _parse_pool.cache_clear()
+    _get_client.cache_clear()
 
-def call_llm(prompt: str, model: str = "gpt-4", agent_name: str = "unknown") -> str:
-    """Call LLM with prompt. Returns response text."""
-    config = get_config()
-    api_key = config["OPENAI_API_KEY"]
 
-    if not api_key:
+@lru_cache(maxsize=4)
+def _parse_pool(pool_json: str) -> Tuple[Endpoint, ...]:
+    """Parse OPENAI_POOL, a JSON list of {"api_key": ..., "base_url": ...} objects."""
+    try:
+        pool = tuple((entry["api_key"], entry.get("base_url")) for entry in orjson.loads(pool_json))
+    except (orjson.JSONDecodeError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid OPENAI_POOL configuration: {e!r}") from e
+    if not pool or not all(api_key for api_key, _ in pool):
+        raise ValueError("OPENAI_POOL must list at least one endpoint, each with an api_key")
+    return pool
+
+
+def _endpoints() -> Tuple[Endpoint, ...]:
+    """Configured endpoints: the OPENAI_POOL entries, else the single OPENAI_API_KEY."""
+    config = _cfg()
+    pool_json = config.get("OPENAI_POOL")
+    if pool_json:
+        return _parse_pool(pool_json)
+    if not config["OPENAI_API_KEY"]:
         raise ValueError("OPENAI_API_KEY not found in configuration")
+    return ((config["OPENAI_API_KEY"], None),)
 
-    client = OpenAI(api_key=api_key)
-    start_time = time.time()
 
+# Requests currently running per endpoint, so new calls go to the least busy one.
+# Not cleared by reset_client(): calls still running on a dropped endpoint drain it to zero.
+_in_flight: Counter = Counter()
+_in_flight_lock = threading.Lock()
+_pick_turn = itertools.count()
+
+
+@contextmanager
+def _checkout(endpoints: Tuple[Endpoint, ...]) -> Iterator[Endpoint]:
+    """Reserve the endpoint with the fewest in-flight requests for the duration of a call."""
+    with _in_flight_lock:
+        # Rotate the starting point so ties are shared round-robin
+        start = next(_pick_turn) % len(endpoints)
+        rotated = endpoints[start:] + endpoints[:start]
+        endpoint = min(rotated, key=_in_flight.__getitem__)
+        _in_flight[endpoint] += 1
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-        )
+        yield endpoint
+    finally:
+        with _in_flight_lock:
+            _in_flight[endpoint] -= 1
+            if not _in_flight[endpoint]:
+                del _in_flight[endpoint]
+
+
+# Identical (model, prompt) pairs within an hour reuse the earlier response text
+_prompt_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_prompt_cache_lock = threading.Lock()
+
+
+# Prompts may be passed pre-encoded as UTF-8 bytes, e.g. long contexts built once and reused
+Prompt = Union[str, bytes]
+
+
+def _prompt_key(model: str, prompt: Prompt) -> str:
+    """Cache key for a prompt sent to a model; str and UTF-8 bytes prompts share a key."""
+    digest = hashlib.sha256(model.encode())
+    digest.update(b"\x00")
+    digest.update(prompt if isinstance(prompt, bytes) else prompt.encode())
+    return digest.hexdigest()
 
-        response_time = int((time.time() - start_time) * 1000)
-        tokens_in = response.usage.prompt_tokens if response.usage else 0
-        tokens_out = response.usage.completion_tokens if response.usage else 0
-        response_text = response.choices[0].message.content or ""
-
-        logger.info(
-            "LLM call successful",
-            extra={
-                "agent": agent_name,
-                "model": model,
-                "status": "SUCCESS",
-                "tokens_in": tokens_in,
-                "tokens_out": tokens_out,
-                "time_ms": response_time,
-            },
-        )
 
-        # Log to database
+def _prompt_text(prompt: Prompt) -> str:
+    """The prompt as the str the OpenAI SDK expects."""
+    return prompt.decode("utf-8") if isinstance(prompt, bytes) else prompt
+
+
+def clear_prompt_cache() -> None:
+    """Forget all cached LLM responses."""
+    with _prompt_cache_lock:
+        _prompt_cache.clear()
+
+
+# Transient provider errors (429, 5xx, connection drops and timeouts) are retried with backoff
+_MAX_ATTEMPTS = 5
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff capped at 30s, jittered so concurrent callers don't retry in step."""
+    return float(min(30.0, 0.5 * 2**attempt) * (0.5 + random.random()))
+
+
+def _log_retry(error: Exception, attempt: int, delay: float, model: str, agent_name: str) -> None:
+    """Note a retried attempt in the llm_calls log; only the final outcome goes to llm_logs."""
+    logger.warning(
+        "LLM call attempt %d/%d failed, retrying in %.1fs: %s",
+        attempt + 1,
+        _MAX_ATTEMPTS,
+        delay,
+        error,
+        extra={"agent": agent_name, "model": model, "status": "RETRY"},
+    )
+
+
+def _create_completion(
+    endpoints: Tuple[Endpoint, ...],
+    model: str,
+    agent_name: str,
+    messages: List[ChatCompletionMessageParam],
+) -> Any:
+    """Create a chat completion, retrying transient errors (possibly on another endpoint)."""
+    for attempt in range(_MAX_ATTEMPTS):
         try:
-            save_llm_log(
-                agent_name=agent_name,
-                model=model,
-                status="SUCCESS",
-                tokens_in=tokens_in,
-                tokens_out=tokens_out,
-                time_ms=response_time,
-            )
-        except Exception as db_error:
-            # Don't fail if database logging fails
-            logger.warning(f"Failed to log to database: {db_error}")
+            with _checkout(endpoints) as endpoint:
+                return _get_client(*endpoint).chat.completions.create(
+                    model=model, messages=messages
+                )
+        except _RETRYABLE_ERRORS as e:
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt)
+            _log_retry(e, attempt, delay, model, agent_name)
+            time.sleep(delay)
+
+
+async def _create_completion_async(
+    clients: Mapping[Endpoint, AsyncOpenAI],
+    model: str,
+    agent_name: str,
+    messages: List[ChatCompletionMessageParam],
+) -> Any:
+    """Async _create_completion over already-open clients, one per endpoint."""
+    endpoints = tuple(clients)
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            with _checkout(endpoints) as endpoint:
+                return await clients[endpoint].chat.completions.create(
+                    model=model, messages=messages
+                )
+        except _RETRYABLE_ERRORS as e:
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt)
+            _log_retry(e, attempt, delay, model, agent_name)
+            await asyncio.sleep(delay)
+
+
+def _record(
+    agent_name: str,
+    model: str,
+    status: str,
+    msg: str,
+    level: int = logging.INFO,
+    tokens_in: int = 0,
+    tokens_out: int = 0,
+    time_ms: int = 0,
+    error_message: Optional[str] = None,
+) -> None:
+    """Write one call outcome to the llm_calls log and queue its llm_logs row."""
+    logger.log(
+        level,
+        msg,
+        extra={
+            "agent": agent_name,
+            "model": model,
+            "status": status,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "time_ms": time_ms,
+        },
+    )
+    _queue_db_log(
+        agent_name=agent_name,
+        model=model,
+        status=status,
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        time_ms=time_ms,
+        error_message=error_message,
+    )
+
+
+def _cached_response(cache_key: str, model: str, agent_name: str) -> Optional[str]:
+    """Return a cached response for the prompt (logging the hit), or None on a miss."""
+    with _prompt_cache_lock:
+        cached = _prompt_cache.get(cache_key)
+    if cached is not None:
+        _record(agent_name, model, "CACHE_HIT", "LLM cache hit")
+    return cached
+
+
+def _llm_success(
+    response: Any,
+    model: str,
+    agent_name: str,
+    start_time: float,
+    cache_key: Optional[str] = None,
+    label: str = "LLM",
+) -> str:
+    """Log a completed call, cache its text when given a cache_key, and return it."""
+    response_time = int((time.time() - start_time) * 1000)
+    tokens_in = response.usage.prompt_tokens if response.usage else 0
+    tokens_out = response.usage.completion_tokens if response.usage else 0
+    response_text = response.choices[0].message.content or ""
+    # Empty replies are usually transient failures, so don't pin them in the cache
+    if cache_key and response_text:
+        with _prompt_cache_lock:
+            _prompt_cache[cache_key] = response_text
+
+    _record(
+        agent_name,
+        model,
+        "SUCCESS",
+        f"{label} call successful",
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        time_ms=response_time,
+    )
+    return response_text
+
+
+def _llm_failure(
+    error: Exception, model: str, agent_name: str, start_time: float, label: str = "LLM"
+) -> None:
+    """Log a failed call; the caller re-raises."""
+    response_time = int((time.time() - start_time) * 1000)
+    # A lone string arg is the message unless the class formats its own __str__
+    # (e.g. UnicodeDecodeError, whose args[0] is just the codec name)
+    if (
+        len(error.args) == 1
+        and isinstance(error.args[0], str)
+        and type(error).__str__ is BaseException.__str__
+    ):
+        error_msg = error.args[0]
+    else:
+        error_msg = str(error)
+    _record(
+        agent_name,
+        model,
+        "FAILED",
+        f"{label} call failed: {error_msg}",
+        level=logging.ERROR,
+        time_ms=response_time,
+        error_message=error_msg,
+    )
+
+
+def call_llm(
+    prompt: Prompt, model: str = "gpt-4", agent_name: str = "unknown", cache: bool = False
+) -> str:
+    """
+    Call LLM with prompt. Returns response text.
 
-        return response_text
+    Pass cache=True only for callers that want the same answer to a repeated prompt.
+    """
+    endpoints = _endpoints()
 
-    except Exception as e:
-        response_time = int((time.time() - start_time) * 1000)
-        error_msg = str(e)
-
-        logger.error(
-            f"LLM call failed: {error_msg}",
-            extra={
-                "agent": agent_name,
-                "model": model,
-                "status": "FAILED",
-                "tokens_in": 0,
-                "tokens_out": 0,
-                "time_ms": response_time,
-            },
+    cache_key = _prompt_key(model, prompt) if cache else None
+    if cache_key:
+        cached = _cached_response(cache_key, model, agent_name)
+        if cached is not None:
+            return cached
+
+    start_time = time.time()
+    try:
+        response = _create_completion(
+            endpoints, model, agent_name, [{"role": "user", "content": _prompt_text(prompt)}]
         )
+    except Exception as e:
+        _llm_failure(e, model, agent_name, start_time)
+        raise
 
-        # Log to database
-        try:
-            save_llm_log(
-                agent_name=agent_name,
-                model=model,
-                status="FAILED",
-                tokens_in=0,
-                tokens_out=0,
-                time_ms=response_time,
-                error_message=error_msg,
+    return _llm_success(response, model, agent_name, start_time, cache_key)
+
+
+async def call_llm_async(
+    prompt: Prompt,
+    model: str = "gpt-4",
+    agent_name: str = "unknown",
+    clients: Optional[Mapping[Endpoint, AsyncOpenAI]] = None,
+    cache: bool = False,
+) -> str:
+    """Async call_llm; pass open clients per endpoint to share their pools across calls."""
+    endpoints = _endpoints()
+
+    cache_key = _prompt_key(model, prompt) if cache else None
+    if cache_key:
+        cached = _cached_response(cache_key, model, agent_name)
+        if cached is not None:
+            return cached
+
+    if clients is None:
+        async with AsyncExitStack() as stack:
+            return await call_llm_async(
+                prompt,
+                model,
+                agent_name,
+                clients=await _open_async_clients(stack, endpoints),
+                cache=cache,
             )
-        except Exception as db_error:
-            # Don't fail if database logging fails
-            logger.warning(f"Failed to log to database: {db_error}")
 
+    start_time = time.time()
+    try:
+        response = await _create_completion_async(
+            clients, model, agent_name, [{"role": "user", "content": _prompt_text(prompt)}]
+        )
+    except Exception as e:
+        _llm_failure(e, model, agent_name, start_time)
         raise
 
+    return _llm_success(response, model, agent_name, start_time, cache_key)
+
+
+async def call_llm_many(
+    prompts: Sequence[Prompt],
+    model: str = "gpt-4",
+    agent_name: str = "unknown",
+    concurrency: int = 4,
+    cache: bool = False,
+) -> List[Union[str, BaseException]]:
+    """
+    Run several prompts concurrently, at most `concurrency` in flight at once.
+
+    Returns one entry per prompt, in order: the response text, or the exception it raised.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    endpoints = _endpoints()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncExitStack() as stack:
+        clients = await _open_async_clients(stack, endpoints)
+
+        async def bounded(prompt: Prompt) -> str:
+            async with semaphore:
+                return await call_llm_async(prompt, model, agent_name, clients=clients, cache=cache)
+
+        return await asyncio.gather(*(bounded(p) for p in prompts), return_exceptions=True)
+
 
 def call_vision(
     image_path: str, prompt: str, model: str = "gpt-4o", agent_name: str = "unknown"
 ) -> str:
     """Call vision API with image. Returns response text."""
-    config = get_config()
-    api_key = config["OPENAI_API_KEY"]
-
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in configuration")
-
-    client = OpenAI(api_key=api_key)
+    endpoints = _endpoints()
     start_time = time.time()
 
     try:
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode("utf-8")
-
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
+        # Map the file instead of read() so only the base64 text is held as a copy
+        with open(image_path, "rb") as image_file, mmap.mmap(
+            image_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as image_map:
+            mime = detect_image_mime(image_map)
+            image_data = base64.b64encode(image_map).decode("ascii")
+
+        response = _create_completion(
+            endpoints,
+            model,
+            agent_name,
+            [
                 {
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompt},
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{image_data}"},
+                            "image_url": {"url": f"data:{mime};base64,{image_data}"},
                         },
                     ],
                 }
             ],
         )
-
-        response_time = int((time.time() - start_time) * 1000)
-        tokens_in = response.usage.prompt_tokens if response.usage else 0
-        tokens_out = response.usage.completion_tokens if response.usage else 0
-        response_text = response.choices[0].message.content or ""
-
-        logger.info(
-            "Vision call successful",
-            extra={
-                "agent": agent_name,
-                "model": model,
-                "status": "SUCCESS",
-                "tokens_in": tokens_in,
-                "tokens_out": tokens_out,
-                "time_ms": response_time,
-            },
-        )
-
-        # Log to database
-        try:
-            save_llm_log(
-                agent_name=agent_name,
-                model=model,
-                status="SUCCESS",
-                tokens_in=tokens_in,
-                tokens_out=tokens_out,
-                time_ms=response_time,
-            )
-        except Exception as db_error:
-            # Don't fail if database logging fails
-            logger.warning(f"Failed to log to database: {db_error}")
-
-        return response_text
-
     except Exception as e:
-        response_time = int((time.time() - start_time) * 1000)
-        error_msg = str(e)
-
-        logger.error(
-            f"Vision call failed: {error_msg}",
-            extra={
-                "agent": agent_name,
-                "model": model,
-                "status": "FAILED",
-                "tokens_in": 0,
-                "tokens_out": 0,
-                "time_ms": response_time,
-            },
-        )
-
-        # Log to database
-        try:
-            save_llm_log(
-                agent_name=agent_name,
-                model=model,
-                status="FAILED",
-                tokens_in=0,
-                tokens_out=0,
-                time_ms=response_time,
-                error_message=error_msg,
-            )
-        except Exception as db_error:
-            # Don't fail if database logging fails
-            logger.warning(f"Failed to log to database: {db_error}")
-
+        _llm_failure(e, model, agent_name, start_time, label="Vision")
         raise
+
+    return _llm_success(response, model, agent_name, start_time, label="Vision")
@@ -0,0 +1,26 @@
+"""LLM cost estimation for ROAMFIT."""
+from functools import lru_cache
+from typing import Tuple
+
+# USD per 1K tokens as (input, output). Checked in order, so "gpt-4o" must precede "gpt-4".
+MODEL_PRICING = {
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4": (0.03, 0.06),
+}
+DEFAULT_RATES = (0.008, 0.008)
+
+
+@lru_cache(maxsize=128)
+def get_model_rates(model: str) -> Tuple[float, float]:
+    """Return (input, output) USD per 1K tokens for a model name."""
+    model_lower = model.lower()
+    for family, rates in MODEL_PRICING.items():
+        if family in model_lower:
+            return rates
+    return DEFAULT_RATES
+
+
+def estimate_cost(model: str, tokens_in: int, tokens_out: int) -> float:
+    """Estimate the USD cost of a model's token usage."""
+    rate_in, rate_out = get_model_rates(model)
+    return (tokens_in / 1000) * rate_in + (tokens_out / 1000) * rate_out
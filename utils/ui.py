@@ -0,0 +1,47 @@
+"""Shared Streamlit page helpers for ROAMFIT."""
+import streamlit as st
+
+from database import create_tables
+
+ABOUT_MARKDOWN = """
+ROAMFIT helps you maintain your fitness routine while traveling.
+
+**Capabilities:**
+- 📷 Detect equipment from photos
+- 🏋️ Generate personalized workouts
+- 📊 Track your progress
+- 📍 Find nearby gyms and tracks
+
+**How to use:**
+- Upload a photo of equipment
+- Ask to generate a workout
+- Chat naturally with the assistant
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_db_ready() -> bool:
+    """Create database tables once per process rather than on every rerun."""
+    create_tables()
+    return True
+
+
+def page_config(page_title: str, page_icon: str, **kwargs) -> None:
+    """Apply the common ROAMFIT page configuration (wide layout)."""
+    st.set_page_config(page_title=page_title, page_icon=page_icon, layout="wide", **kwargs)
+
+
+def build_sidebar() -> None:
+    """Render the chat sidebar with the about section and clear-chat button."""
+    with st.sidebar:
+        st.header("⚙️ ROAMFIT")
+        st.markdown("**Multi-agentic fitness assistant**")
+
+        st.divider()
+        st.markdown("### 📖 About")
+        st.markdown(ABOUT_MARKDOWN)
+
+        st.divider()
+        if st.button("🗑️ Clear Chat", use_container_width=True):
+            st.session_state.messages = []
+            st.rerun()
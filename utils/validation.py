@@ -1,8 +1,9 @@
 """Input validation utilities for ROAMFIT."""
 import logging
+import mmap
 import re
 from pathlib import Path
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,8 @@ ALLOWED_EQUIPMENT = {
     "body weight",
     "no equipment",
 }
+# Lowercased once so each lookup is a single hash probe
+_ALLOWED_EQUIPMENT_LC = frozenset(name.lower() for name in ALLOWED_EQUIPMENT)
 
 # Maximum image size (10MB default)
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -57,6 +60,13 @@ MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/jpg", "image/png"]
 ALLOWED_IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png"]
 
+# Leading signature bytes of each supported image type; add formats here
+_IMAGE_SIGNATURES = ((b"\xff\xd8", "image/jpeg"), (b"\x89PNG\r\n\x1a\n", "image/png"))
+_IMAGE_HEADER_LEN = max(len(signature) for signature, _ in _IMAGE_SIGNATURES)
+
+# "lat, lng" coordinates, compiled once; groups capture the two numbers
+_LAT_LNG_RE = re.compile(r"(-?\d+\.?\d*),\s*(-?\d+\.?\d*)")
+
 
 def validate_image_file(
     file_content: bytes, filename: Optional[str] = None, max_size: int = MAX_IMAGE_SIZE
@@ -78,16 +88,24 @@ def validate_image_file(
         if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
             return False, f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}"
 
-    # Check magic bytes (basic image validation)
-    if file_content[:2] == b"\xff\xd8":  # JPEG
-        return True, None
-    elif file_content[:8] == b"\x89PNG\r\n\x1a\n":  # PNG
-        return True, None
-    elif filename and filename.lower().endswith((".jpg", ".jpeg", ".png")):
-        # If extension is valid, accept it (magic bytes check is best-effort)
-        return True, None
+    # Check magic bytes; a valid extension alone doesn't make a corrupt file an image
+    if _sniff_image_mime(file_content) is None:
+        return False, "Invalid image format. Only JPEG and PNG are supported"
+
+    return True, None
 
-    return False, "Invalid image format. Only JPEG and PNG are supported"
+
+def _sniff_image_mime(data: bytes) -> Optional[str]:
+    """MIME type matching the data's magic bytes, or None if no signature matches."""
+    for signature, mime in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    return None
+
+
+def detect_image_mime(data: Union[bytes, mmap.mmap]) -> str:
+    """MIME type of image data from its magic bytes, falling back to image/jpeg."""
+    return _sniff_image_mime(data[:_IMAGE_HEADER_LEN]) or "image/jpeg"
 
 
 def validate_equipment_list(equipment: List[str]) -> Tuple[bool, Optional[str], List[str]]:
@@ -101,7 +119,8 @@ def validate_equipment_list(equipment: List[str]) -> Tuple[bool, Optional[str],
     if not isinstance(equipment, list):
         return False, "Equipment must be a list", []
 
-    normalized: List[str] = []
+    # Lowercased name -> first spelling seen, so repeats are dropped in one pass
+    normalized: Dict[str, str] = {}
     invalid: List[str] = []
 
     for item in equipment:
@@ -109,17 +128,16 @@ def validate_equipment_list(equipment: List[str]) -> Tuple[bool, Optional[str],
             invalid.append(str(item))
             continue
 
-        item_lower = item.strip().lower()
-        if not item_lower:
+        stripped = item.strip()
+        key = stripped.lower()
+        if not key or key in normalized:
             continue
 
         # Check if equipment is in allowed list (case-insensitive)
-        if any(item_lower == allowed.lower() for allowed in ALLOWED_EQUIPMENT):
-            normalized.append(item.strip())
-        else:
+        if key not in _ALLOWED_EQUIPMENT_LC:
             # Allow custom equipment but log it
-            logger.warning(f"Custom equipment name detected: {item}")
-            normalized.append(item.strip())  # Allow it but warn
+            logger.warning("Custom equipment name detected: %s", item)
+        normalized[key] = stripped
 
     if invalid:
         return False, f"Invalid equipment items (must be strings): {invalid}", []
@@ -127,7 +145,7 @@ def validate_equipment_list(equipment: List[str]) -> Tuple[bool, Optional[str],
     if not normalized:
         return False, "No valid equipment items found", []
 
-    return True, None, normalized
+    return True, None, list(normalized.values())
 
 
 def validate_location(location: str) -> Tuple[bool, Optional[str]]:
@@ -142,19 +160,15 @@ def validate_location(location: str) -> Tuple[bool, Optional[str]]:
     location = location.strip()
 
     # Check if it's lat/lng format (e.g., "40.7128, -74.0060" or "40.7128,-74.0060")
-    lat_lng_pattern = r"^-?\d+\.?\d*,\s*-?\d+\.?\d*$"
-    if re.match(lat_lng_pattern, location):
-        parts = location.split(",")
-        try:
-            lat = float(parts[0].strip())
-            lng = float(parts[1].strip())
-            if not (-90 <= lat <= 90):
-                return False, "Latitude must be between -90 and 90"
-            if not (-180 <= lng <= 180):
-                return False, "Longitude must be between -180 and 180"
-            return True, None
-        except ValueError:
-            return False, "Invalid latitude/longitude format"
+    match = _LAT_LNG_RE.fullmatch(location)
+    if match:
+        # The groups are plain decimal numbers, so float() cannot fail here
+        lat, lng = float(match.group(1)), float(match.group(2))
+        if not (-90 <= lat <= 90):
+            return False, "Latitude must be between -90 and 90"
+        if not (-180 <= lng <= 180):
+            return False, "Longitude must be between -180 and 180"
+        return True, None
 
     # Check if it's a reasonable address/place name (at least 2 characters)
     if len(location) < 2:
@@ -172,6 +186,12 @@ def validate_workout_id(workout_id: Any) -> Tuple[bool, Optional[str], Optional[
     Validate workout ID.
     Returns (is_valid, error_message, workout_id_int)
     """
+    # Already an int (e.g. a typed path parameter): no parsing or try/except needed
+    if type(workout_id) is int:
+        if workout_id <= 0:
+            return False, "Workout ID must be a positive integer", None
+        return True, None, workout_id
+
     try:
         workout_id_int = int(workout_id)
         if workout_id_int <= 0: